@@ -1,26 +1,77 @@
 
 # Minimal TUI for dotfiles management
 
-import curses, os, subprocess, pathlib, shlex, threading, time, queue, shutil
-from .ops import load_config, ensure_packages, clone_repos, package_plan
+import curses, os, subprocess, pathlib, shlex, threading, time, queue, shutil, stat
+import collections, concurrent.futures, functools, itertools
+from .ops import load_config, ensure_packages, clone_repos, package_plan, read_output_lines
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 STOW_DIR = ROOT / "stow"
 
-# UI event queue (all curses drawing must happen on main thread)
+# UI event queue (all curses drawing must happen on main thread). Each event is
+# (kind, ...) with a per-kind shape:
+#   ("toast", is_error, title, lines)
+#   ("confirm_remove", {"files": (...), "dirs": (...)})
+#   ("redraw",)
 ui_events = queue.Queue()
 
 # Icons
 ICONS = {"info": "·", "success": "✓", "warn": "!", "error": "✗"}
+# Log line prefixes per level, formatted once
+PREFIX = {k: f"{v} " for k, v in ICONS.items()}
+_DEFAULT_PREFIX = "• "
 HINT_MENU = "↑/↓ navigate  ⏎ select  ? help  q quit"
 HINT_PAGE = "␣ toggle  ⏎ run  a/u all/none  / filter  ? help  b back"
+HELP_MENU = (
+    "↑/↓ k/j  navigate",
+    "⏎        open page",
+    "q        quit",
+)
+HELP_PAGE = (
+    "↑/↓ k/j  navigate       ␣  toggle select",
+    "a  all    u  none        i  invert",
+    "⏎  run    /  filter      r  refresh",
+    "D  cleanup (stow page)   c  clear log",
+    "b  back to menu",
+)
+PAGE_PAD = 2  # left/right margin of the page view
+
+# Env flag values treated as "on"
+_TRUTHY = frozenset(("1", "true", "yes", "on"))
+
+def _env_on(name: str) -> bool:
+    return os.environ.get(name, "0").lower() in _TRUTHY
+
+# Status-bar lines, fixed at import: the menu, then one per page (indexed by pane)
+# with a marker when that page's worker runs dry
+STATUS_MENU = f"  {HINT_MENU}"
+STATUS_PAGES = (
+    f"  {HINT_PAGE}" + ("  [dry]" if _env_on("DOTFILES_REMOVE_DRY") else ""),
+    f"  {HINT_PAGE}" + ("  [dry]" if _env_on("DOTFILES_THEMES_DRY") else ""),
+    f"  {HINT_PAGE}",
+    f"  {HINT_PAGE}",
+)
+# Fixed-width spinner frames so a tick rewrites only these cells of the status bar
+SPINNER_FRAMES = ("·   ", "··  ", "··· ", "····")
+SPINNER_X = 2
 
 # Color pairs (will be initialized if colors available)
 COLORS = {}
 
+# Resolved attributes bound once by init_colors() for the draw paths;
+# the defaults are the monochrome fallbacks
+C_TITLE = curses.A_BOLD
+C_CURSOR = curses.A_REVERSE
+C_ACCENT = curses.A_BOLD
+C_SUCCESS = curses.A_BOLD
+C_WARN = curses.A_DIM
+C_ERROR = curses.A_DIM
+C_INFO = curses.A_DIM
+C_STATUS = curses.A_DIM
+
 def init_colors():
     """Initialize muted color pairs for a minimal look"""
-    global COLORS
+    global COLORS, C_TITLE, C_CURSOR, C_ACCENT, C_SUCCESS, C_WARN, C_ERROR, C_INFO, C_STATUS
     if not curses.has_colors():
         return
 
@@ -45,23 +96,75 @@ def init_colors():
             'dim': curses.A_DIM,
             'status': curses.color_pair(7) | curses.A_DIM
         }
+        C_TITLE = COLORS['title']
+        C_CURSOR = COLORS['cursor']
+        C_ACCENT = COLORS['accent']
+        C_SUCCESS = COLORS['success']
+        C_WARN = COLORS['warn']
+        C_ERROR = COLORS['error']
+        C_INFO = COLORS['info']
+        C_STATUS = COLORS['status']
     except curses.error:
         pass
 
+# (STOW_DIR mtime_ns, package names) from the last scan
+_pkg_cache = (None, None)
+
 def list_packages():
-    """List available stow packages"""
-    if not STOW_DIR.exists():
+    """List available stow packages (cached until STOW_DIR's mtime changes)"""
+    global _pkg_cache
+    try:
+        mt = os.stat(STOW_DIR).st_mtime_ns
+    except OSError:
         return []
-    return sorted([p.name for p in STOW_DIR.iterdir() if p.is_dir()])
+    if mt == _pkg_cache[0]:
+        return list(_pkg_cache[1])
+    with os.scandir(STOW_DIR) as it:
+        names = sorted(e.name for e in it if e.is_dir())
+    _pkg_cache = (mt, names)
+    return list(names)
+
+OMZ_PLUGIN_MARK = "/.oh-my-zsh/custom/plugins/"
+
+def index_repos(cfg) -> tuple[list[dict], list[str | None]]:
+    """cfg repos in order, with each one's oh-my-zsh plugin name (None for other repos)."""
+    repos = list(cfg.get("repos", []))
+    names = []
+    for r in repos:
+        dest = r.get("dest", "")
+        names.append(dest.split(OMZ_PLUGIN_MARK)[-1] if OMZ_PLUGIN_MARK in dest else None)
+    return repos, names
+
+@functools.lru_cache(maxsize=16)
+def fit_line(text: str, w: int) -> str:
+    """text clipped/padded to exactly w columns; memoized since bars repeat every frame."""
+    return text[:w].ljust(w)
+
+def match_items(items, items_lc, needle):
+    """Return (items, keys) whose precomputed casefolded key contains needle (already casefolded).
+    Keys shorter than needle are rejected on length alone, before any substring search.
+    """
+    n = len(needle)
+    hits = [(it, key) for it, key in zip(items, items_lc) if len(key) >= n and needle in key]
+    return [it for it, _ in hits], [key for _, key in hits]
+
+# Normalized absolute $HOME, computed once for the path guards
+HOME_STR = os.path.abspath(os.path.expanduser("~"))
+HOME_PREFIX = HOME_STR.rstrip(os.sep) + os.sep  # "$HOME/"; just "/" when HOME is the root
 
-def inside_home_guard(path: pathlib.Path) -> bool:
+def _inside_home_str(s: str) -> bool:
+    """Fast guard for already absolute, normalized path strings."""
+    return s == HOME_STR or s.startswith(HOME_PREFIX)
+
+def inside_home_guard(path: str | os.PathLike) -> bool:
     """Return True iff path is lexically under $HOME (no traversal above HOME).
     This guard does NOT follow symlinks; use additional checks for recursive deletes.
     """
     try:
-        home = pathlib.Path(os.path.expanduser("~")).absolute()
-        p = pathlib.Path(path).expanduser().absolute()
-        return p.is_relative_to(home)
+        s = os.fspath(path)
+        if s[:1] == "~":
+            s = os.path.expanduser(s)
+        return _inside_home_str(os.path.abspath(s))
     except Exception:
         return False
 
@@ -69,46 +172,118 @@ def enumerate_stow_targets_for_pkgs(pkgs) -> tuple[list[str], list[str]]:
     """Walk stow/<pkg> trees and return (files, dirs) as HOME-absolute target paths,
     exactly mirroring Stow mapping with -t "$HOME". Skip .git folders. De-duplicate and sort.
     """
-    home = pathlib.Path(os.path.expanduser("~"))
+    prefix = HOME_PREFIX
+    # One package yields each target once, so entries are appended to plain lists;
+    # sets are only needed to merge several packages
+    files_acc: list[str] = []
+    dirs_acc: list[str] = []
+
+    def walk(src_dir: str, rel: str):
+        # rel: target path relative to $HOME, with a trailing separator ("" at the package root).
+        # DirEntry carries the file type from readdir, so no extra stat per entry.
+        try:
+            it = os.scandir(src_dir)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir()  # symlinked dirs count as dirs, like os.walk
+                except OSError:
+                    is_dir = False
+                target = prefix + rel + name
+                if is_dir:
+                    # Skip VCS dirs
+                    if name == ".git":
+                        continue
+                    if _inside_home_str(target):
+                        dirs_acc.append(target)
+                    # Walk without following symlinks
+                    if not entry.is_symlink():
+                        walk(entry.path, rel + name + os.sep)
+                elif _inside_home_str(target):
+                    # Files (regular or symlink) -> treated as file targets
+                    files_acc.append(target)
+
+    stow_root = os.fspath(STOW_DIR)
+    pkg_names = sorted(set(pkgs))
     files: set[str] = set()
     dirs: set[str] = set()
-
-    for pkg in sorted(set(pkgs)):
-        pkg_dir = STOW_DIR / pkg
-        if not pkg_dir.exists() or not pkg_dir.is_dir():
+    for pkg in pkg_names:
+        pkg_dir = os.path.join(stow_root, pkg)
+        if not os.path.isdir(pkg_dir):
             continue
-        # Walk without following symlinks
-        for root, dnames, fnames in os.walk(pkg_dir, topdown=True, followlinks=False):
-            # Skip VCS dirs
-            dnames[:] = [d for d in dnames if d != ".git"]
-            root_path = pathlib.Path(root)
-            rel_root = root_path.relative_to(pkg_dir)
-            # Add directories (excluding the package root itself)
-            if str(rel_root) != ".":
-                target_dir = home / rel_root
-                if inside_home_guard(target_dir):
-                    dirs.add(str(target_dir))
-            # Add subdirectories explicitly as targets too
-            for d in dnames:
-                rel_dir = (rel_root / d)
-                if str(rel_dir) == ".":
-                    continue
-                target_dir = home / rel_dir
-                if inside_home_guard(target_dir):
-                    dirs.add(str(target_dir))
-            # Add files (regular or symlink) -> treated as file targets
-            for f in fnames:
-                rel_file = (rel_root / f)
-                target_file = home / rel_file
-                if inside_home_guard(target_file):
-                    files.add(str(target_file))
+        walk(pkg_dir, "")
+        if len(pkg_names) > 1:
+            # Merge this package's batch; packages may share target dirs
+            files.update(files_acc)
+            dirs.update(dirs_acc)
+            files_acc.clear()
+            dirs_acc.clear()
 
     # De-duplicate and sort; ensure deterministic order
-    files_list = sorted(files)
+    files_list = sorted(files or files_acc)
     # For directory deletion, remove deeper ones first later; but here just sort
-    dirs_list = sorted(dirs)
+    dirs_list = sorted(dirs or dirs_acc)
     return files_list, dirs_list
 
+@functools.lru_cache(maxsize=8)
+def stow_targets_cached(pkgs: tuple[str, ...]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """enumerate_stow_targets_for_pkgs memoized on the sorted package tuple, so a
+    cancelled D preview is not rescanned on retry. Cleared by the 'r' refresh.
+    """
+    files, dirs = enumerate_stow_targets_for_pkgs(pkgs)
+    return tuple(files), tuple(dirs)
+
+def safe_addstr(win, y, x, s, attr=0, maxw=None):
+    """addstr clipped to the window bounds (and maxw) instead of raising curses.error.
+    The bottom-right cell is never written since curses errors after filling it.
+    """
+    h, w = win.getmaxyx()
+    if 0 <= y < h and 0 <= x < w:
+        room = w - x - (1 if y == h - 1 else 0)
+        if maxw is not None:
+            room = min(room, maxw)
+        if room > 0:
+            win.addstr(y, x, s[:room], attr)
+
+# modal_fill's sub-windows by (y, x, h, w), for the screen size in "size"
+_modal_fills = {"size": None, "fills": {}}
+MODAL_FILLS_MAX = 16
+
+def modal_fill(stdscr, y, x, h, w):
+    """Return a function painting a modal box's reverse-video background.
+
+    A sub-window with an A_REVERSE background fills the box with one erase();
+    boxes that do not fit the screen fall back to per-row blank writes. The
+    fill is cached per box, since toast() repaints the same box every frame,
+    and the cache is dropped when the screen size changes.
+    """
+    size = stdscr.getmaxyx()
+    fills = _modal_fills["fills"]
+    if _modal_fills["size"] != size or len(fills) >= MODAL_FILLS_MAX:
+        fills.clear()
+        _modal_fills["size"] = size
+    key = (y, x, h, w)
+    fill = fills.get(key)
+    if fill is None:
+        fill = fills[key] = _new_modal_fill(stdscr, y, x, h, w)
+    return fill
+
+def _new_modal_fill(stdscr, y, x, h, w):
+    try:
+        win = stdscr.subwin(h, w, y, x)
+    except (curses.error, ValueError):
+        blank = " " * w
+        def fill():
+            for row in range(h):
+                safe_addstr(stdscr, y + row, x, blank, curses.A_REVERSE)
+        return fill
+    win.syncok(True)  # erase() marks the shared cells changed in stdscr too
+    win.bkgd(' ', curses.A_REVERSE)
+    return win.erase
+
 def confirm_remove_dialog(stdscr, paths: list[str]) -> bool:
     """Centered modal listing planned removals. Ask user to type the exact count to confirm. ESC cancels."""
     total = len(paths)
@@ -123,52 +298,42 @@ def confirm_remove_dialog(stdscr, paths: list[str]) -> bool:
     box_h = 8 + len(visible) + (1 if more > 0 else 0)
     start_x, start_y = (w - box_w) // 2, (h - box_h) // 2
 
+    # Static strings for the redraw loop, built once per dialog
+    fill = modal_fill(stdscr, start_y, start_x, box_h, box_w)
+    top_border = "+" + "-" * (box_w - 2) + "+"
+    side_char = "|"
+    title = f"Selective Cleanup: {total} item(s) will be removed"
+    hint = f"Type {total} to confirm, Esc to cancel"
+    display_lines = ["- ~/" + p[len(HOME_PREFIX):] if p.startswith(HOME_PREFIX) else f"- {p}" for p in visible]
+
     typed = ""
     curses.curs_set(1)
     try:
         while True:
-            # Clear area
-            for y in range(start_y, start_y + box_h):
-                try:
-                    stdscr.addstr(y, start_x, " " * box_w, curses.A_REVERSE)
-                except curses.error:
-                    pass
-            # Border
+            # One handler per frame; safe_addstr clips instead of raising
             try:
-                stdscr.addstr(start_y, start_x, "+" + "-" * (box_w - 2) + "+", curses.A_REVERSE)
+                fill()
+                # Border
+                safe_addstr(stdscr, start_y, start_x, top_border, curses.A_REVERSE)
                 for y in range(start_y + 1, start_y + box_h - 1):
-                    stdscr.addstr(y, start_x, "|", curses.A_REVERSE)
-                    stdscr.addstr(y, start_x + box_w - 1, "|", curses.A_REVERSE)
-                stdscr.addstr(start_y + box_h - 1, start_x, "+" + "-" * (box_w - 2) + "+", curses.A_REVERSE)
-            except curses.error:
-                pass
+                    safe_addstr(stdscr, y, start_x, side_char, curses.A_REVERSE)
+                    safe_addstr(stdscr, y, start_x + box_w - 1, side_char, curses.A_REVERSE)
+                safe_addstr(stdscr, start_y + box_h - 1, start_x, top_border, curses.A_REVERSE)
 
-            title = f"Selective Cleanup: {total} item(s) will be removed"
-            hint = f"Type {total} to confirm, Esc to cancel"
-            try:
-                stdscr.addstr(start_y + 1, start_x + 2, title[:box_w-4], curses.A_REVERSE | curses.A_BOLD)
-            except curses.error:
-                pass
+                safe_addstr(stdscr, start_y + 1, start_x + 2, title, curses.A_REVERSE | curses.A_BOLD, box_w - 4)
 
-            list_y = start_y + 3
-            for i, p in enumerate(visible):
-                line = ("~" + str(pathlib.Path(p).expanduser()).replace(str(pathlib.Path.home()), "")) if p.startswith(str(pathlib.Path.home())) else p
-                try:
-                    stdscr.addstr(list_y + i, start_x + 2, f"- {line}"[:box_w-4], curses.A_REVERSE)
-                except curses.error:
-                    pass
-            if more > 0:
-                try:
-                    stdscr.addstr(list_y + len(visible), start_x + 2, f"... and {more} more"[:box_w-4], curses.A_REVERSE | curses.A_DIM)
-                except curses.error:
-                    pass
+                list_y = start_y + 3
+                for i, line in enumerate(display_lines):
+                    safe_addstr(stdscr, list_y + i, start_x + 2, line, curses.A_REVERSE, box_w - 4)
+                if more > 0:
+                    safe_addstr(stdscr, list_y + len(visible), start_x + 2, f"... and {more} more", curses.A_REVERSE | curses.A_DIM, box_w - 4)
 
-            input_y = start_y + box_h - 3
-            try:
-                stdscr.addstr(input_y, start_x + 2, hint[:box_w-4], curses.A_REVERSE)
-                stdscr.addstr(input_y + 1, start_x + 2, ("Confirm count: " + typed)[:box_w-4], curses.A_REVERSE)
+                input_y = start_y + box_h - 3
+                safe_addstr(stdscr, input_y, start_x + 2, hint, curses.A_REVERSE, box_w - 4)
+                safe_addstr(stdscr, input_y + 1, start_x + 2, "Confirm count: " + typed, curses.A_REVERSE, box_w - 4)
                 stdscr.move(input_y + 1, start_x + 2 + len("Confirm count: ") + len(typed))
-                stdscr.refresh()
+                stdscr.noutrefresh()
+                curses.doupdate()
             except curses.error:
                 pass
 
@@ -204,37 +369,40 @@ def selective_cleanup_worker(files: list[str], dirs: list[str], logger):
       - Remove dirs: default rmdir if empty; if DOTFILES_REMOVE_FORCE: rmtree.
       - Return summary dict: {'files_removed': n1, 'dirs_removed': n2, 'skipped': k, 'errors': e, 'dry_run': bool}
     """
-    dry = os.getenv("DOTFILES_REMOVE_DRY", "0") in ("1", "true", "yes", "on")
-    force = os.getenv("DOTFILES_REMOVE_FORCE", "0") in ("1", "true", "yes", "on")
+    env = os.environ
+    dry = env.get("DOTFILES_REMOVE_DRY", "0").lower() in _TRUTHY
+    force = env.get("DOTFILES_REMOVE_FORCE", "0").lower() in _TRUTHY
 
     files_removed = 0
     dirs_removed = 0
     skipped = 0
     errors = 0
 
-    home = pathlib.Path(os.path.expanduser("~")).absolute()
+    home = pathlib.Path(HOME_STR)
 
     # Remove files and symlinks first
     logger("info", f"Planned removals: {len(files)} file(s)/link(s), {len(dirs)} dir(s)" + (" [DRY RUN]" if dry else ""))
 
     for f in files:
         try:
-            p = pathlib.Path(f)
-            if not inside_home_guard(p):
+            if not inside_home_guard(f):
                 logger("warn", f"skip: outside $HOME (guard): {f}")
                 skipped += 1
                 continue
-            if not p.exists() and not p.is_symlink():
+            # One lstat answers both "exists" and "what kind"
+            try:
+                mode = os.lstat(f).st_mode
+            except FileNotFoundError:
                 logger("info", f"skip: not found: {f}")
                 skipped += 1
                 continue
             # We never follow symlinks for file targets; unlink() handles both
             if dry:
-                kind = "symlink" if p.is_symlink() else ("file" if p.exists() else "file/symlink")
+                kind = "symlink" if stat.S_ISLNK(mode) else "file"
                 logger("info", f"plan: unlink {kind}: {f}")
                 continue
             try:
-                p.unlink(missing_ok=True)
+                pathlib.Path(f).unlink(missing_ok=True)
                 logger("success", f"removed: {f}")
                 files_removed += 1
             except Exception as e:
@@ -245,22 +413,26 @@ def selective_cleanup_worker(files: list[str], dirs: list[str], logger):
             errors += 1
 
     # Then directories; attempt to remove deepest first to handle nesting
-    # Sort by depth descending
-    dirs_sorted = sorted(dirs, key=lambda s: s.count(os.sep), reverse=True)
+    # Sort by depth descending (decorate once, sort tuples, undecorate)
+    decorated = [(s.count(os.sep), s) for s in dirs]
+    decorated.sort(reverse=True)
+    dirs_sorted = [s for _, s in decorated]
 
     for d in dirs_sorted:
         try:
-            p = pathlib.Path(d)
-            if not inside_home_guard(p):
+            if not inside_home_guard(d):
                 logger("warn", f"skip dir: outside $HOME (guard): {d}")
                 skipped += 1
                 continue
-            if not p.exists() and not p.is_symlink():
+            try:
+                mode = os.lstat(d).st_mode
+            except FileNotFoundError:
                 logger("info", f"skip dir: not found: {d}")
                 skipped += 1
                 continue
+            p = pathlib.Path(d)
             # If target is a file or symlink, treat like file unlink attempt
-            if p.is_file() or p.is_symlink():
+            if stat.S_ISREG(mode) or stat.S_ISLNK(mode):
                 if dry:
                     logger("info", f"plan: unlink file/symlink for dir target: {d}")
                     continue
@@ -282,7 +454,7 @@ def selective_cleanup_worker(files: list[str], dirs: list[str], logger):
             # Extra safety for recursive deletes: ensure resolved path under HOME and not a symlink
             if force:
                 try:
-                    if p.is_symlink():
+                    if stat.S_ISLNK(mode):
                         # Do not rmtree symlink dirs; just unlink
                         p.unlink(missing_ok=True)
                         logger("success", f"removed symlink dir: {d}")
@@ -366,36 +538,71 @@ def theme_sources() -> list[pathlib.Path]:
             pass
     return sources
 
+_THEME_EXTS = {".json", ".toml", ".ini", ".css"}
+
 def discover_themes() -> dict[str, pathlib.Path]:
     """Return {theme_name: source_path}. Prefer earlier sources on name conflicts.
     - theme_name: folder name or file stem.
     - source_path: absolute path to the folder or file in the repo.
     Includes top-level files with extensions: .json, .toml, .ini, .css
     """
-    exts = {".json", ".toml", ".ini", ".css"}
+    exts = _THEME_EXTS
     result: dict[str, pathlib.Path] = {}
     for src_dir in theme_sources():
         try:
-            for entry in sorted(src_dir.iterdir(), key=lambda p: p.name.lower()):
+            # scandir: DirEntry type checks come from the dirent (stat only for symlinks)
+            with os.scandir(src_dir) as it:
+                entries = sorted(it, key=lambda e: e.name.lower())
+            for entry in entries:
                 name = None
                 if entry.name == ".git":
                     continue
                 if entry.is_dir():
                     name = entry.name
-                elif entry.is_file() and entry.suffix.lower() in exts:
-                    name = entry.stem
-                if not name:
+                elif entry.is_file():
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() in exts:
+                        name = stem
+                if not name or name in result:
                     continue
-                if name not in result:
-                    try:
-                        result[name] = entry.resolve()
-                    except Exception:
-                        result[name] = entry.absolute()
+                # Resolve lazily: only the winning entry for a name pays for it
+                p = pathlib.Path(entry.path)
+                try:
+                    result[name] = p.resolve()
+                except Exception:
+                    result[name] = p.absolute()
         except Exception:
             # Skip unreadable source directories
             continue
     return result
 
+def discover_theme_one(name: str) -> pathlib.Path | None:
+    """Resolve a single theme by name with the same precedence as discover_themes(),
+    stopping at the first source that provides it.
+    """
+    if not name or name in (".", "..", ".git") or os.sep in name:
+        return None
+    for src_dir in theme_sources():
+        try:
+            cand = src_dir / name
+            if not cand.is_dir():
+                # Top-level file theme: pick the first <name>.<ext> in discover order
+                with os.scandir(src_dir) as it:
+                    files = [e for e in it
+                             if os.path.splitext(e.name)[0] == name
+                             and os.path.splitext(e.name)[1].lower() in _THEME_EXTS
+                             and e.is_file()]
+                if not files:
+                    continue
+                cand = pathlib.Path(min(files, key=lambda e: e.name.lower()).path)
+            try:
+                return cand.resolve()
+            except Exception:
+                return cand.absolute()
+        except Exception:
+            continue
+    return None
+
 def ensure_dest() -> pathlib.Path:
     """Create and return Path('~/.config/omarchy/themes').expanduser().resolve()"""
     home = pathlib.Path(os.path.expanduser("~"))
@@ -429,6 +636,22 @@ def _safe_remove_target(target: pathlib.Path, logger):
         logger("error", f"failed to remove {target}: {e}")
         raise
 
+def _copy_tree(src_dir: str, dst_dir: str, logger):
+    """Recursive merge copy using os.scandir. Skips .git and symlinked directories."""
+    os.makedirs(dst_dir, exist_ok=True)
+    with os.scandir(src_dir) as it:
+        entries = list(it)
+    for entry in entries:
+        d_path = os.path.join(dst_dir, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != ".git":
+                _copy_tree(entry.path, d_path, logger)
+            continue
+        if entry.is_symlink() and entry.is_dir():
+            continue  # os.walk(followlinks=False) never descended these either
+        logger("info", f"copy: {entry.path} -> {d_path}")
+        shutil.copy2(entry.path, d_path)  # in-kernel sendfile on Linux; full copystat
+
 def copy_theme(src: pathlib.Path, dst_root: pathlib.Path, force: bool, logger) -> tuple[bool, str]:
     """Copy one theme (folder or file) to dst_root/<name>.
     - If force: remove existing target (file or dir) first (unlink or rmtree).
@@ -471,17 +694,7 @@ def copy_theme(src: pathlib.Path, dst_root: pathlib.Path, force: bool, logger) -
             shutil.copy2(src_resolved, dst_target)
         elif src_resolved.is_dir():
             # Merge copy (create dirs, overwrite files)
-            for root, dnames, fnames in os.walk(src_resolved, topdown=True, followlinks=False):
-                # Skip .git
-                dnames[:] = [d for d in dnames if d != ".git"]
-                rel_root = pathlib.Path(root).relative_to(src_resolved)
-                out_dir = dst_target / rel_root
-                out_dir.mkdir(parents=True, exist_ok=True)
-                for f in fnames:
-                    s_file = pathlib.Path(root) / f
-                    d_file = out_dir / f
-                    logger("info", f"copy: {s_file} -> {d_file}")
-                    shutil.copy2(s_file, d_file)
+            _copy_tree(str(src_resolved), str(dst_target), logger)
         else:
             logger("warn", f"skip: not a regular file or directory: {src_resolved}")
             return False, name
@@ -496,10 +709,10 @@ def copy_themes_worker(selected_names: list[str], logger) -> dict:
     Respects DOTFILES_THEMES_DRY and DOTFILES_THEMES_FORCE.
     Returns summary dict.
     """
-    dry = os.getenv("DOTFILES_THEMES_DRY", "0") in ("1", "true", "yes", "on")
-    force = os.getenv("DOTFILES_THEMES_FORCE", "0") in ("1", "true", "yes", "on")
+    env = os.environ
+    dry = env.get("DOTFILES_THEMES_DRY", "0").lower() in _TRUTHY
+    force = env.get("DOTFILES_THEMES_FORCE", "0").lower() in _TRUTHY
 
-    themes = discover_themes()
     dest = ensure_dest()
 
     ok = 0
@@ -507,8 +720,10 @@ def copy_themes_worker(selected_names: list[str], logger) -> dict:
     errors = 0
 
     logger("info", f"Copying {len(selected_names)} theme(s) to {dest}" + (" [DRY RUN]" if dry else ""))
+    jobs: list[tuple[str, pathlib.Path]] = []
     for name in selected_names:
-        src = themes.get(name)
+        # Resolve only the selected names instead of crawling every theme source
+        src = discover_theme_one(name)
         if not src:
             logger("warn", f"skip: source not found for theme '{name}'")
             skipped += 1
@@ -518,32 +733,59 @@ def copy_themes_worker(selected_names: list[str], logger) -> dict:
             target = (dest / (src.name if src.is_file() else name))
             logger("info", f"plan: copy {src} -> {target}" + (" (force replace)" if force else ""))
             continue
-        try:
-            ok_single, _ = copy_theme(src, dest, force, logger)
-            if ok_single:
-                ok += 1
-            else:
-                errors += 1
-        except Exception as e:
-            logger("error", f"exception copying '{name}': {e}")
-            errors += 1
+        jobs.append((name, src))
+
+    if jobs:
+        # Themes are independent and copying is IO-bound: overlap them on a small pool.
+        # Log calls from pool threads are serialized so lines never interleave.
+        log_lock = threading.Lock()
+
+        def locked_logger(level, msg):
+            with log_lock:
+                logger(level, msg)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+            futures = {pool.submit(copy_theme, src, dest, force, locked_logger): name for name, src in jobs}
+            for fut in concurrent.futures.as_completed(futures):
+                try:
+                    ok_single, _ = fut.result()
+                    if ok_single:
+                        ok += 1
+                    else:
+                        errors += 1
+                except Exception as e:
+                    locked_logger("error", f"exception copying '{futures[fut]}': {e}")
+                    errors += 1
 
     return {"ok": ok, "skipped": skipped, "errors": errors, "dry": dry}
 
 def check_stow():
     """Check if stow is installed"""
-    return subprocess.call("command -v stow >/dev/null 2>&1", shell=True) == 0
+    return shutil.which("stow") is not None
 
-def run_cmd(cmd, logger, cwd=None):
-    """Run command and stream output to logger"""
-    logger("cmd", f"{cmd}")
+def run_cmd(cmd, logger, cwd=None, log_lines=None):
+    """Run command (argv list, or a string split with shlex) and stream output to logger.
+
+    Output is read in chunks as it arrives and handed on a chunk's worth of
+    lines at a time: to log_lines(level, lines) when given, else per line.
+    """
+    argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+    logger("cmd", shlex.join(argv))
     p = subprocess.Popen(
-        cmd, shell=True, cwd=cwd, text=True,
-        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1,
+        argv, cwd=cwd,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
         env={**os.environ, "HOME": os.path.expanduser("~")}
     )
-    for line in p.stdout or []:
-        logger("info", line.rstrip("\n"))
+    def emit(lines):
+        if log_lines:
+            log_lines("info", lines)
+        else:
+            for line in lines:
+                logger("info", line)
+    with p.stdout:
+        # Same chunked, universal-newline splitting as ops.run
+        for lines in read_output_lines(p.stdout.fileno()):
+            emit(lines)
     p.wait()
 
     if p.returncode == 0:
@@ -553,39 +795,190 @@ def run_cmd(cmd, logger, cwd=None):
 
     return p.returncode
 
+def _level_attr(level):
+    """Color attribute for a log level; other levels render dim."""
+    if level == "success":
+        return C_SUCCESS
+    if level == "error":
+        return C_ERROR
+    if level == "warn":
+        return C_WARN
+    return curses.A_DIM
+
 class LogBuf:
-    """Ring buffer for log messages with levels and auto-follow"""
+    """Ring buffer for log messages with levels and auto-follow.
+    add() may be called from worker threads; the curses pad that caches rendered
+    rows is only touched from the main thread (sync_pad/draw_log).
+    """
+    PAD_ROWS = 256  # rendered rows kept in the pad (ring); older rows render directly
+    BATCH_LINES = 32  # add() raises dirty after this many lines...
+    FLUSH_INTERVAL = 0.15  # ...or once this long has passed since it last did (initial value)
+
     def __init__(self, cap=5000):
-        self.lines = []
+        # Parallel columns (text, color attr); oldest lines evicted in O(1)
+        self.texts = collections.deque(maxlen=cap)
+        self.attrs = collections.deque(maxlen=cap)
         self.cap = cap
         self.scroll = 0
         self.follow = True
         self.dirty = True  # mark when content changes
+        self.total = 0  # sequence number of the next line (lines ever added since clear)
+        self.pad = None
+        self.pad_w = 0
+        self.pad_synced = 0  # lines with seq < pad_synced are rendered in the pad
+        self._lock = threading.Lock()
+        self._since_dirty = 0  # lines added since dirty was last raised
+        self._last_dirty_t = 0.0
+        self.flush_interval = self.FLUSH_INTERVAL  # tuned by main() from measured draw times
 
     def add(self, level, msg):
-        icon = ICONS.get(level, "•")
-        self.lines.append(f"{icon} {msg}")
-        if len(self.lines) > self.cap:
-            self.lines = self.lines[-self.cap:]
+        # The color is classified once here, not per paint
+        text = PREFIX.get(level, _DEFAULT_PREFIX) + msg
+        attr = _level_attr(level)
+        with self._lock:
+            self.texts.append(text)
+            self.attrs.append(attr)
+            self.total += 1
         if self.follow:
             self.scroll = 0
+        # Bursts from workers raise dirty in batches rather than per line
+        self._bump(1)
+
+    def add_many(self, level, msgs):
+        """Append several lines of one level under a single lock; dirty is raised at most once."""
+        prefix = PREFIX.get(level, _DEFAULT_PREFIX)
+        attr = _level_attr(level)
+        texts = [prefix + m for m in msgs]
+        if not texts:
+            return
+        with self._lock:
+            self.texts.extend(texts)
+            self.attrs.extend(itertools.repeat(attr, len(texts)))
+            self.total += len(texts)
+        if self.follow:
+            self.scroll = 0
+        self._bump(len(texts))
+
+    def _bump(self, n):
+        self._since_dirty += n
+        now = time.monotonic()
+        if self._since_dirty >= self.BATCH_LINES or now - self._last_dirty_t >= self.flush_interval:
+            self._mark_dirty(now)
+
+    def _mark_dirty(self, now):
         self.dirty = True
+        self._since_dirty = 0
+        self._last_dirty_t = now
+
+    @property
+    def held(self):
+        """Lines added since dirty was last raised (waiting on flush_due)."""
+        return self._since_dirty
+
+    def flush_due(self):
+        """Raise dirty for lines held back by batching once flush_interval has passed (main loop tick)."""
+        if self._since_dirty:
+            now = time.monotonic()
+            if now - self._last_dirty_t >= self.flush_interval:
+                self._mark_dirty(now)
 
     def clear(self):
-        self.lines.clear()
+        with self._lock:
+            self.texts.clear()
+            self.attrs.clear()
+            self.total = 0
+        self.pad_synced = 0
         self.scroll = 0
         self.follow = True
         self.dirty = True
 
-def clear_rect(win, y, x, h, w):
-    """Clear a rectangle"""
-    for row in range(h):
-        if y + row >= 0:
+    def get(self, seq):
+        """(attr, text) with absolute sequence number seq, or a blank entry if it was evicted."""
+        with self._lock:
+            i = seq - (self.total - len(self.texts))
+            if 0 <= i < len(self.texts):
+                return self.attrs[i], self.texts[i]
+            return 0, ""
+
+    def sync_pad(self, w):
+        """Render lines added since the last sync into the pad (main thread only).
+        Returns (first_seq, total) of the buffer at sync time.
+        """
+        if self.pad is None or self.pad_w != w:
+            self.pad = curses.newpad(self.PAD_ROWS, w + 1)  # +1: never write the last column
+            self.pad_w = w
+            self.pad_synced = 0
+        with self._lock:
+            total = self.total
+            first = total - len(self.texts)
+            start = max(self.pad_synced, first, total - self.PAD_ROWS)
+            texts = list(itertools.islice(self.texts, start - first, None))
+            attrs = list(itertools.islice(self.attrs, start - first, None))
+        pad, rows = self.pad, self.PAD_ROWS
+        for seq, (line, attr) in enumerate(zip(texts, attrs), start):
+            row = seq % rows
+            pad.move(row, 0)
+            pad.clrtoeol()
+            pad.addnstr(row, 0, line, w, attr)
+        self.pad_synced = total
+        return first, total
+
+def draw_log(win, buf, y, x, h, w, force=False):
+    """Paint the last h visible lines of buf below a divider at row y.
+    Rows are copied from the buffer's pad; only lines added since the last
+    paint get rendered. No-op unless buf is dirty (or force); clears buf.dirty.
+    """
+    if not (buf.dirty or force):
+        return
+    first, total = buf.sync_pad(w)
+    count = total - first
+    if count:
+        draw_line(win, y, x, w)
+        view_start = first + max(0, count - h - buf.scroll)
+        view_end = min(total, view_start + h)
+        pad_first = max(first, total - buf.PAD_ROWS)
+        seq, row = view_start, y + 1
+        try:
+            while seq < view_end:
+                if seq >= pad_first:
+                    # Contiguous run of pad rows up to the ring wrap point
+                    prow = seq % buf.PAD_ROWS
+                    n = min(view_end - seq, buf.PAD_ROWS - prow)
+                    buf.pad.overwrite(win, prow, 0, row, x, row + n - 1, x + w - 1)
+                else:
+                    # Scrolled back past what the pad holds
+                    n = 1
+                    attr, line = buf.get(seq)
+                    win.addnstr(row, x, line, w, attr)
+                    win.clrtoeol()
+                seq += n
+                row += n
+        except curses.error:
+            pass
+        painted = view_end - view_start
+        for extra in range(h - painted):
             try:
-                win.move(y + row, x)
+                win.move(y + 1 + painted + extra, x)
                 win.clrtoeol()
             except curses.error:
                 pass
+    else:
+        # Emptied (e.g. cleared): blank the divider and rows a partial draw would keep
+        clear_rect(win, y, x, h + 1, w)
+    buf.dirty = False
+
+@functools.lru_cache(8)
+def _blank(w: int) -> str:
+    return " " * w
+
+def clear_rect(win, y, x, h, w):
+    """Clear a rectangle with one blank-run write per row"""
+    blank = _blank(w)
+    for row in range(max(0, -y), h):
+        try:
+            win.addstr(y + row, x, blank)
+        except curses.error:
+            pass  # bottom-right cell
 
 def draw_line(win, y, x, w, label=None):
     """Draw a thin horizontal divider with optional label"""
@@ -621,6 +1014,71 @@ def draw_box(win, y, x, h, w, title=None):
     except curses.error:
         pass
 
+UIState = collections.namedtuple(
+    "UIState", "view menu_idx pane idx filter_text show_help sel_version "
+               "log_total log_scroll log_follow running size")
+
+def changed_regions(old, new) -> set[str] | None:
+    """Page regions whose inputs differ between two UIStates, or None when the
+    change needs a full repaint (other view/pane/filter/size, help, menu)."""
+    if (old is None or new.view != "page" or old.view != new.view or old.pane != new.pane
+            or old.filter_text != new.filter_text or old.show_help != new.show_help
+            or old.size != new.size):
+        return None
+    regions = set()
+    if old.idx != new.idx or old.sel_version != new.sel_version:
+        regions.add('list')
+    if old.sel_version != new.sel_version:
+        regions.add('title')
+    if (old.log_total, old.log_scroll, old.log_follow) != (new.log_total, new.log_scroll, new.log_follow):
+        regions.add('log')
+    if old.running != new.running:
+        regions.add('status')
+    return regions
+
+class PaneState:
+    """One page's items, selection set and current filter view.
+    filt/filt_keys are updated in place, so held references stay valid.
+    """
+    __slots__ = ("all", "keys", "sel", "filt", "filt_keys", "matches")
+    MATCHES_MAX = 64  # memoized needles per pane before the memo starts over
+
+    def __init__(self, items, sel):
+        self.sel = sel
+        self.filt = []
+        self.filt_keys = []
+        self.matches = {}  # needle -> (items, keys); valid until set_items
+        self.set_items(items)
+
+    def set_items(self, items):
+        """(Re)load items: rebuild the casefolded match keys and drop stale selections."""
+        self.all = items
+        self.keys = [it.casefold() for it in items]
+        self.sel &= set(items)
+        self.matches.clear()
+        # Always copy: a refresh can rename entries without changing the count
+        self.filt[:] = self.all
+        self.filt_keys[:] = self.keys
+
+    def reset(self):
+        """Clear the filter view; all is unchanged since set_items, so filt is a
+        subsequence of it and equal length means already unfiltered."""
+        if len(self.filt) != len(self.all):
+            self.filt[:] = self.all
+            self.filt_keys[:] = self.keys
+
+    def filter(self, needle, narrow=False):
+        """Keep items whose key contains needle; narrow=True rescans only the current view.
+        Results are memoized per needle, so backspacing to an earlier filter is a lookup.
+        """
+        hit = self.matches.get(needle)
+        if hit is None:
+            src, src_keys = (self.filt, self.filt_keys) if narrow else (self.all, self.keys)
+            if len(self.matches) >= self.MATCHES_MAX:
+                self.matches.clear()
+            hit = self.matches[needle] = match_items(src, src_keys, needle)
+        self.filt[:], self.filt_keys[:] = hit
+
 def toast(stdscr, title, lines, is_error=False):
     """Show a minimal centered overlay"""
     H, W = stdscr.getmaxyx()
@@ -634,8 +1092,7 @@ def toast(stdscr, title, lines, is_error=False):
     sx = (W - box_w) // 2
 
     try:
-        for y in range(box_h):
-            stdscr.addstr(sy + y, sx, ' ' * box_w, curses.A_REVERSE)
+        modal_fill(stdscr, sy, sx, box_h, box_w)()
         stdscr.addstr(sy + 1, sx + 2, title[:box_w - 4], curses.A_REVERSE | curses.A_BOLD)
         for i, line in enumerate(content_lines):
             stdscr.addstr(sy + 2 + i, sx + 2, line[:box_w - 4], curses.A_REVERSE)
@@ -643,7 +1100,8 @@ def toast(stdscr, title, lines, is_error=False):
     except curses.error:
         pass
 
-    stdscr.refresh()
+    # Staged only: draw() and the event loop flush it with their own doupdate()
+    stdscr.noutrefresh()
 
 def password_dialog(stdscr, title="Enter sudo password:"):
     """Show a password input dialog using overlay approach."""
@@ -654,6 +1112,11 @@ def password_dialog(stdscr, title="Enter sudo password:"):
     password = ""
     max_password_len = box_w - 14
 
+    # Static strings for the redraw loop, built once per dialog
+    fill = modal_fill(stdscr, start_y, start_x, box_h, box_w)
+    top_border = "+" + "-" * (box_w - 2) + "+"
+    side_char = "|"
+
     # Store original screen content to restore later
     try:
         # Create a simple overlay approach - draw directly on main screen but save/restore
@@ -663,15 +1126,14 @@ def password_dialog(stdscr, title="Enter sudo password:"):
             """Draw dialog as overlay on main screen"""
             try:
                 # Clear dialog area with solid background
-                for y in range(start_y, start_y + box_h):
-                    stdscr.addstr(y, start_x, " " * box_w, curses.A_REVERSE)
+                fill()
 
                 # Draw simple box using basic characters (more compatible)
-                stdscr.addstr(start_y, start_x, "+" + "-" * (box_w - 2) + "+", curses.A_REVERSE)
+                safe_addstr(stdscr, start_y, start_x, top_border, curses.A_REVERSE)
                 for y in range(start_y + 1, start_y + box_h - 1):
-                    stdscr.addstr(y, start_x, "|", curses.A_REVERSE)
-                    stdscr.addstr(y, start_x + box_w - 1, "|", curses.A_REVERSE)
-                stdscr.addstr(start_y + box_h - 1, start_x, "+" + "-" * (box_w - 2) + "+", curses.A_REVERSE)
+                    safe_addstr(stdscr, y, start_x, side_char, curses.A_REVERSE)
+                    safe_addstr(stdscr, y, start_x + box_w - 1, side_char, curses.A_REVERSE)
+                safe_addstr(stdscr, start_y + box_h - 1, start_x, top_border, curses.A_REVERSE)
 
                 # Content with high contrast
                 title_y = start_y + 1
@@ -679,28 +1141,23 @@ def password_dialog(stdscr, title="Enter sudo password:"):
                 help_y = start_y + 5
 
                 # Title
-                stdscr.addstr(title_y, start_x + 2, title[:box_w-4], curses.A_REVERSE | curses.A_BOLD)
+                safe_addstr(stdscr, title_y, start_x + 2, title, curses.A_REVERSE | curses.A_BOLD, box_w - 4)
 
                 # Password field
-                stdscr.addstr(input_y, start_x + 2, "Password:", curses.A_REVERSE)
+                safe_addstr(stdscr, input_y, start_x + 2, "Password:", curses.A_REVERSE)
 
                 # Show password as stars
                 if password:
                     mask = "*" * len(password)
-                    stdscr.addstr(input_y, start_x + 12, mask, curses.A_REVERSE)
-
-                # Clear any extra chars in password field
-                remaining_space = max_password_len - len(password)
-                if remaining_space > 0:
-                    stdscr.addstr(input_y, start_x + 12 + len(password), " " * remaining_space, curses.A_REVERSE)
+                    safe_addstr(stdscr, input_y, start_x + 12, mask, curses.A_REVERSE)
 
                 # Instructions
-                help_text = "Enter=OK, Esc=Cancel"[:box_w-4]
-                stdscr.addstr(help_y, start_x + 2, help_text, curses.A_REVERSE)
+                safe_addstr(stdscr, help_y, start_x + 2, "Enter=OK, Esc=Cancel", curses.A_REVERSE, box_w - 4)
 
                 # Position cursor
                 stdscr.move(input_y, start_x + 12 + len(password))
-                stdscr.refresh()
+                stdscr.noutrefresh()
+                curses.doupdate()
 
             except curses.error:
                 pass  # Ignore positioning errors
@@ -739,28 +1196,40 @@ def password_dialog(stdscr, title="Enter sudo password:"):
             pass
         return None
 
+# monotonic time until which a verified sudo timestamp is trusted without
+# re-running `sudo -n true` (well inside sudo's default 5 minute timeout)
+SUDO_OK_TTL = 60.0
+_sudo_ok_until = 0.0
+
+def forget_sudo_cache():
+    """Force the next ensure_sudo_cached_on_main to re-verify (after a sudo step failed)."""
+    global _sudo_ok_until
+    _sudo_ok_until = 0.0
+
 def ensure_sudo_cached_on_main(stdscr, logger) -> bool:
     """Ensure sudo credential timestamp is cached (main thread only).
     Returns True if sudo available, False if user cancelled or auth failed.
     """
+    global _sudo_ok_until
     try:
-        if os.geteuid() == 0:
+        if os.geteuid() == 0 or time.monotonic() < _sudo_ok_until:
             return True
         # Non-interactive check first
-        if subprocess.call("sudo -n true", shell=True,
+        if subprocess.call(["sudo", "-n", "true"],
                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0:
+            _sudo_ok_until = time.monotonic() + SUDO_OK_TTL
             return True
         pwd = password_dialog(stdscr, "Enter sudo password:")
         if pwd is None:
             logger("info", "Cancelled by user")
             return False
-        p = subprocess.run("sudo -S -v", shell=True, text=True,
-                           input=pwd + "\n",
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        p = subprocess.run(["sudo", "-S", "-v"], text=True,
+                           input=pwd + "\n", capture_output=True)
         if p.returncode != 0:
             logger("error", "Invalid sudo password")
             return False
         logger("success", "Sudo authenticated")
+        _sudo_ok_until = time.monotonic() + SUDO_OK_TTL
         return True
     except Exception as e:
         logger("error", f"Failed to authenticate sudo: {e}")
@@ -781,8 +1250,8 @@ def main(stdscr):
     cfg = load_config()
     stow_pkgs = list_packages()
     sys_pkgs = package_plan(cfg)
-    plugin_repos = [r for r in cfg.get("repos", []) if "/.oh-my-zsh/custom/plugins/" in r.get("dest", "")]
-    plugins = [r["dest"].split("/.oh-my-zsh/custom/plugins/")[-1] for r in plugin_repos]
+    repos, repo_plugin_names = index_repos(cfg)  # rebuilt on 'r' refresh
+    plugins = [n for n in repo_plugin_names if n is not None]
 
     # UI state
     panes = ["Stow Packages", "Themes", "System Packages", "Plugins"]
@@ -799,111 +1268,180 @@ def main(stdscr):
     selected_pkgs = set(sys_pkgs)
     selected_plugins = set(plugins)
 
+    # Per-pane state, indexed by current_pane
+    panes_state = [
+        PaneState(stow_pkgs, selected_stow),
+        PaneState(theme_names, selected_themes),
+        PaneState(sys_pkgs, selected_pkgs),
+        PaneState(plugins, selected_plugins),
+    ]
+
     # Filter state
     filter_text = ""
-    filtered_stow = stow_pkgs[:]
-    filtered_themes = theme_names[:]
-    filtered_pkgs = sys_pkgs[:]
-    filtered_plugins = plugins[:]
+    sel_flags = []  # parallel to the current pane's filtered list
 
     log = LogBuf()
-    is_running = False
+    running_ev = threading.Event()  # set while a worker runs; cleared by the worker itself
     running_label = None
     show_help = False
+    toast_active = None  # (title, lines, is_error) overlaid by draw() until a key dismisses it
     action_thread = None
     last_draw = 0.0
-    last_spinner_frame = -1
-    last_log_redraw_time = 0.0
-    LOG_REDRAW_INTERVAL = 0.15
-    suppress_enter_once = False
-
+    spinner_frame = 0  # advanced every spinner_period while a worker runs; read by _draw_status
+    spinner_t = 0.0
+    spinner_period = 0.25
+    # Draw-time feedback: slow frames stretch the log flush and spinner cadence
+    # (fewer repaints), fast frames shrink them back (snappier streaming)
+    draw_ms_hist = collections.deque(maxlen=32)
+    DRAW_MS_SLOW, DRAW_MS_FAST = 20.0, 5.0
+    IDLE_TIMEOUT_MS = 200  # getch wait with nothing animating or pending
+    UI_DRAIN_BUDGET = 0.016  # max time spent draining ui_events per loop tick
+    MIN_DRAW_INTERVAL = 1 / 60  # repaint at most once per frame; extra causes coalesce
+    pending = set()  # draw causes since the last repaint: 'full', 'log', 'status', 'spinner'
+    # Keys applied back-to-back before a single draw (navigation/selection only;
+    # anything that may open a dialog ends the batch)
+    BATCH_KEYS = frozenset(map(ord, "jkaAuUiI ")) | {
+        curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE, curses.KEY_HOME, curses.KEY_END}
+    queued_keys = collections.deque()
+    # Key-triggered draws diff this state against the last drawn one: nothing changed
+    # means no draw, otherwise only the affected page regions are repainted.
+    # Keys that paint outside draw() or reload the lists always get a full repaint.
+    sel_version = 0  # bumped whenever a selection set changes
+    stow_sorted = (None, ())  # (sel_version, sorted selected_stow) for selected_stow_sorted()
+    last_ui_state = None
+    FULL_DRAW_KEYS = frozenset((ord('/'), ord('D'), ord('?'), ord('r'), 10, 13, curses.KEY_RESIZE))
+
+    def ui_state():
+        return UIState(view, menu_idx, current_pane, idx, filter_text, show_help, sel_version,
+                       log.total, log.scroll, log.follow, running_ev.is_set(), stdscr.getmaxyx())
     def logger(level, msg):
         # Headless logger: only mutates buffer; draw happens in main loop tick
         log.add(level, msg)
 
-    def get_current_data():
-        """Get current pane's data (items, selected, filtered)"""
-        if current_pane == 0:
-            return stow_pkgs, selected_stow, filtered_stow
-        elif current_pane == 1:
-            return theme_names, selected_themes, filtered_themes
-        elif current_pane == 2:
-            return sys_pkgs, selected_pkgs, filtered_pkgs
-        else:
-            return plugins, selected_plugins, filtered_plugins
-
-    def apply_filter():
-        """Apply current filter to all panes"""
-        nonlocal filtered_stow, filtered_themes, filtered_pkgs, filtered_plugins, idx
-
-        if not filter_text:
-            filtered_stow = stow_pkgs[:]
-            filtered_themes = theme_names[:]
-            filtered_pkgs = sys_pkgs[:]
-            filtered_plugins = plugins[:]
+    def apply_filter(prev_text=None):
+        """Apply current filter to the current pane (the only one a filter can be
+        typed on; opening another page resets the filter and re-applies it there).
+
+        When the filter only grew since prev_text, narrow the already-filtered list.
+        """
+        nonlocal idx
+        ft = filter_text.casefold()
+        narrow = bool(prev_text) and ft.startswith(prev_text.casefold())
+        pane = panes_state[current_pane]
+        if ft:
+            pane.filter(ft, narrow)
         else:
-            ft = filter_text.lower()
-            filtered_stow = [p for p in stow_pkgs if ft in p.lower()]
-            filtered_themes = [t for t in theme_names if ft in t.lower()]
-            filtered_pkgs = [p for p in sys_pkgs if ft in p.lower()]
-            filtered_plugins = [p for p in plugins if ft in p.lower()]
-
-        # Adjust index for current pane
-        _, _, current_filtered = get_current_data()
-        idx = min(idx, max(0, len(current_filtered) - 1))
-
-    def draw(partial: bool = False):
-        """Draw minimal UI — either menu or page view."""
-        nonlocal show_help, last_draw, last_spinner_frame
+            pane.reset()
+
+        idx = clamp_idx(idx)
+        rebuild_sel_flags()
+
+    def clamp_idx(i):
+        """i limited to the current pane's filtered rows."""
+        return max(0, min(i, len(panes_state[current_pane].filt) - 1))
+
+    def selected_stow_sorted():
+        """sorted(selected_stow) as a tuple, re-sorted only after a selection change."""
+        nonlocal stow_sorted
+        if stow_sorted[0] != sel_version:
+            stow_sorted = (sel_version, tuple(sorted(selected_stow)))
+        return stow_sorted[1]
+
+    def rebuild_sel_flags():
+        """Selection state of the current pane's filtered rows, by position."""
+        nonlocal sel_flags
+        pane = panes_state[current_pane]
+        sel = pane.sel
+        sel_flags = [item in sel for item in pane.filt]
+
+    # Page regions to repaint on the next draw(); a full draw marks them all
+    dirty = {'title': True, 'list': True, 'log': True, 'status': True}
+    # Front buffer of the list rows: screen row -> (text, attr) last written there.
+    # Rows whose content is unchanged are not re-sent to curses on partial draws;
+    # anything that wipes the virtual screen (erase, body clear) empties it.
+    list_rows_drawn = {}
+    spinner_y = None  # status row showing the running spinner, until the next full draw
+
+    def draw(partial: bool = False, flush: bool = True):
+        """Draw minimal UI — either menu or page view.
+        Full draws erase() the virtual screen (curses then diffs against the last frame);
+        partial draws only repaint the regions marked in `dirty`. Output is flushed
+        once via noutrefresh() + doupdate(); flush=False leaves the doupdate() to a
+        caller that still has something to add to the frame.
+        """
+        nonlocal show_help, last_draw, last_ui_state, spinner_y
+        t0 = time.perf_counter()
         H, W = stdscr.getmaxyx()
 
         if H < 10 or W < 30:
-            stdscr.clear()
+            stdscr.erase()
             try:
                 stdscr.addstr(H // 2, max(0, (W - 10) // 2), "Too small", curses.A_DIM)
             except curses.error:
                 pass
-            stdscr.refresh()
+            stdscr.noutrefresh()
+            curses.doupdate()
             return
 
         if not partial:
-            stdscr.clear()
+            stdscr.erase()
+            list_rows_drawn.clear()
+            spinner_y = None
+            for region in dirty:
+                dirty[region] = True
 
         if view == "menu":
             _draw_menu(stdscr, H, W)
         else:
-            _draw_page(stdscr, H, W, partial)
+            _draw_page(stdscr, H, W)
 
-        # ── Help overlay ──
+        # ── Overlays ──
+        if toast_active:
+            toast(stdscr, *toast_active)
         if show_help:
-            if view == "menu":
-                help_lines = [
-                    "↑/↓ k/j  navigate",
-                    "⏎        open page",
-                    "q        quit",
-                ]
-            else:
-                help_lines = [
-                    "↑/↓ k/j  navigate       ␣  toggle select",
-                    "a  all    u  none        i  invert",
-                    "⏎  run    /  filter      r  refresh",
-                    "D  cleanup (stow page)   c  clear log",
-                    "b  back to menu",
-                ]
+            help_lines = HELP_MENU if view == "menu" else HELP_PAGE
             toast(stdscr, "Keys", help_lines)
 
-        stdscr.refresh()
-        last_draw = time.time()
+        stdscr.noutrefresh()
+        if flush:
+            curses.doupdate()
+        last_draw = time.monotonic()
+        last_ui_state = ui_state()
         log.dirty = False
+        for region in dirty:
+            dirty[region] = False
+        draw_ms_hist.append((time.perf_counter() - t0) * 1000)
+        adapt_cadence()
+
+    def idle_timeout():
+        """getch timeout (ms): only as short as the next periodic job needs, so an
+        idle UI blocks in the kernel; keys still return immediately."""
+        if pending:
+            return max(1, int(MIN_DRAW_INTERVAL * 1000))  # a coalesced repaint awaits its slot
+        if running_ev.is_set():
+            return int(min(spinner_period, log.flush_interval) * 1000)
+        if log.held:
+            return int(log.flush_interval * 1000)  # lines held back by batching
+        return IDLE_TIMEOUT_MS
+
+    def adapt_cadence():
+        """Nudge log flush and spinner intervals by the mean of recent draw times."""
+        nonlocal spinner_period
+        mean_ms = sum(draw_ms_hist) / len(draw_ms_hist)
+        if mean_ms > DRAW_MS_SLOW:
+            log.flush_interval = min(0.25, log.flush_interval * 1.25)
+            spinner_period = min(0.5, spinner_period * 1.25)
+        elif mean_ms < DRAW_MS_FAST:
+            log.flush_interval = max(0.05, log.flush_interval * 0.8)
+            spinner_period = max(0.2, spinner_period * 0.8)
 
     def _draw_menu(stdscr, H, W):
         """Draw centered home screen with button list."""
         # Title centered near top third
         title = "dotfiles"
-        title_attr = COLORS.get('title', curses.A_BOLD)
         title_y = max(1, H // 4 - 2)
         try:
-            stdscr.addstr(title_y, (W - len(title)) // 2, title, title_attr)
+            stdscr.addstr(title_y, (W - len(title)) // 2, title, C_TITLE)
         except curses.error:
             pass
 
@@ -917,7 +1455,7 @@ def main(stdscr):
 
             if is_cur:
                 # Highlighted button: reverse video
-                attr = COLORS.get('cursor', curses.A_REVERSE)
+                attr = C_CURSOR
                 prefix = "▸ "
             else:
                 attr = curses.A_DIM
@@ -932,133 +1470,185 @@ def main(stdscr):
         # Hint bar at bottom
         status_y = H - 1
         try:
-            stdscr.addstr(status_y, 0, f"  {HINT_MENU}"[:W].ljust(W), COLORS.get('status', curses.A_DIM))
+            stdscr.addstr(status_y, 0, fit_line(STATUS_MENU, W), C_STATUS)
         except curses.error:
             pass
 
-    def _draw_page(stdscr, H, W, partial):
-        """Draw category detail page."""
-        nonlocal last_spinner_frame
-        PAD = 2
+    def _page_layout(H, W):
+        """Row layout of the page view: (list_start_y, list_end_y, log_view_h, status_y)."""
         status_y = H - 1
-
-        # ── Row 0: Back + page title + count ──
-        all_items, selected_items, filtered_items = get_current_data()
+        list_start_y = 3 if filter_text else 2
+        log_lines_count = min(4, max(1, len(log.texts)))
+        list_end_y = status_y - (log_lines_count + 2)
+        log_view_h = min(log_lines_count, status_y - list_end_y - 1)
+        return list_start_y, list_end_y, log_view_h, status_y
+
+    last_list_end_y = -1
+    last_status_state = None
+
+    def _draw_page(stdscr, H, W):
+        """Draw category detail page, one region at a time."""
+        nonlocal last_list_end_y, last_status_state
+        list_start_y, list_end_y, log_view_h, status_y = _page_layout(H, W)
+        if list_end_y != last_list_end_y:
+            # Log area grew/shrank: the list and log boundaries moved; blank the
+            # whole body so a partial draw leaves no rows from the old layout
+            clear_rect(stdscr, list_start_y, 0, status_y - list_start_y, W)
+            list_rows_drawn.clear()
+            dirty['list'] = dirty['log'] = True
+            last_list_end_y = list_end_y
+        status_state = (running_ev.is_set(), running_label)
+        if status_state != last_status_state:
+            # Worker started/finished since the status bar was painted
+            dirty['status'] = True
+            last_status_state = status_state
+
+        if dirty['title']:
+            _draw_title(stdscr, W)
+        if dirty['list']:
+            _draw_list(stdscr, W, list_start_y, list_end_y)
+        # draw_log also repaints on its own when log.dirty is set
+        draw_log(stdscr, log, list_end_y, PAGE_PAD, log_view_h, W - PAGE_PAD * 2, force=dirty['log'])
+        if dirty['status']:
+            _draw_status(stdscr, W, status_y)
+
+    def _draw_title(stdscr, W):
+        """Row 0: back + page title + count; row 1: divider; row 2: filter indicator."""
+        pane = panes_state[current_pane]
         page_title = f"← {panes[current_pane]}"
-        count_str = f"{len(selected_items)}/{len(all_items)}"
-        title_attr = COLORS.get('accent', curses.A_BOLD)
+        count_str = f"{len(pane.sel)}/{len(pane.all)}"
         try:
-            stdscr.addstr(0, PAD, page_title, title_attr)
-            stdscr.addstr(0, W - len(count_str) - PAD, count_str, curses.A_DIM)
+            stdscr.move(0, 0)
+            stdscr.clrtoeol()  # the count may have shrunk since the last paint
+            stdscr.addstr(0, PAGE_PAD, page_title, C_ACCENT)
+            stdscr.addstr(0, W - len(count_str) - PAGE_PAD, count_str, curses.A_DIM)
         except curses.error:
             pass
-
-        # ── Row 1: Divider ──
-        if not partial:
-            draw_line(stdscr, 1, PAD, W - PAD * 2)
-
-        # ── Row 2+: Filter indicator ──
-        list_start_y = 2
-        if filter_text and not partial:
+        draw_line(stdscr, 1, PAGE_PAD, W - PAGE_PAD * 2)
+        if filter_text:
             try:
-                stdscr.addstr(list_start_y, PAD, f"/ {filter_text}", COLORS.get('info', curses.A_DIM))
+                stdscr.addstr(2, PAGE_PAD, f"/ {filter_text}", C_INFO)
             except curses.error:
                 pass
-            list_start_y += 1
 
-        # ── List area ──
-        log_lines_count = min(4, max(1, len(log.lines)))
-        log_area = log_lines_count + 2
-        list_end_y = status_y - log_area
+    def _draw_list(stdscr, W, list_start_y, list_end_y):
+        """List area between the title rows and the log divider."""
+        pane = panes_state[current_pane]
+        filtered_items = pane.filt
         list_h = list_end_y - list_start_y
+        if list_h <= 0:
+            return
+        if not filtered_items:
+            list_rows_drawn.clear()
+            msg = "nothing here" if not pane.all else f"no matches for '{filter_text}'"
+            try:
+                stdscr.addstr(list_start_y + 1, PAGE_PAD + 2, msg, curses.A_DIM)
+            except curses.error:
+                pass
+            return
+        view_h = list_h
+        start_idx = max(0, idx - view_h + 1) if idx >= view_h else 0
+        # Loop-invariant lookups bound once per paint
+        width = W - PAGE_PAD * 2
+        cur_attr, sel_attr, dim_attr = C_CURSOR, C_SUCCESS, curses.A_DIM
+        addstr, addnstr, clrtoeol = stdscr.addstr, stdscr.addnstr, stdscr.clrtoeol
+        for i, item in enumerate(filtered_items[start_idx:start_idx + view_h]):
+            real_idx = start_idx + i
+            is_sel = sel_flags[real_idx]
+            is_cur = real_idx == idx
+
+            cursor = "▸ " if is_cur else "  "
+            check = "✓ " if is_sel else "· "
+            text = f"{cursor}{check}{item}"
 
-        if not partial and list_h > 0:
-            if not filtered_items:
-                msg = "nothing here" if not all_items else f"no matches for '{filter_text}'"
-                try:
-                    stdscr.addstr(list_start_y + 1, PAD + 2, msg, curses.A_DIM)
-                except curses.error:
-                    pass
+            if is_cur:
+                attr = cur_attr
+            elif is_sel:
+                attr = sel_attr
             else:
-                view_h = list_h
-                start_idx = max(0, idx - view_h + 1) if idx >= view_h else 0
-                for i, item in enumerate(filtered_items[start_idx:start_idx + view_h]):
-                    real_idx = start_idx + i
-                    is_sel = item in selected_items
-                    is_cur = real_idx == idx
-
-                    cursor = "▸ " if is_cur else "  "
-                    check = "✓ " if is_sel else "· "
-                    text = f"{cursor}{check}{item}"
-
-                    if is_cur:
-                        attr = COLORS.get('cursor', curses.A_REVERSE)
-                    elif is_sel:
-                        attr = COLORS.get('success', curses.A_BOLD)
-                    else:
-                        attr = curses.A_DIM
-                    try:
-                        stdscr.addstr(list_start_y + i, PAD, text[:W - PAD * 2].ljust(W - PAD * 2), attr)
-                    except curses.error:
-                        pass
-
-        # ── Log area ──
-        log_divider_y = list_end_y
-        usable_w = W - PAD * 2
-
-        if log.lines:
-            draw_line(stdscr, log_divider_y, PAD, usable_w)
-            log_view_h = min(log_lines_count, status_y - log_divider_y - 1)
-            view_start = max(0, len(log.lines) - log_view_h - log.scroll)
-            view_end = view_start + log_view_h
-            for i, line in enumerate(log.lines[view_start:view_end]):
-                color = curses.A_DIM
-                if line.startswith(ICONS["success"]):
-                    color = COLORS.get('success', curses.A_DIM)
-                elif line.startswith(ICONS["error"]):
-                    color = COLORS.get('error', curses.A_DIM)
-                elif line.startswith(ICONS["warn"]):
-                    color = COLORS.get('warn', curses.A_DIM)
-                padded = line[:usable_w].ljust(usable_w)
-                try:
-                    stdscr.addstr(log_divider_y + 1 + i, PAD, padded, color)
-                except curses.error:
-                    pass
-            painted = len(log.lines[view_start:view_end])
-            for extra in range(log_view_h - painted):
-                try:
-                    stdscr.addstr(log_divider_y + 1 + painted + extra, PAD, ' ' * usable_w)
-                except curses.error:
-                    pass
+                attr = dim_attr
+            y = list_start_y + i
+            if list_rows_drawn.get(y) == (text, attr):
+                continue  # row already shows exactly this
+            list_rows_drawn[y] = (text, attr)
+            try:
+                if is_cur:
+                    # Padded so the highlight bar spans the full width
+                    addstr(y, PAGE_PAD, text[:width].ljust(width), attr)
+                else:
+                    # Clipped write + clear-to-EOL: no per-row padded copy
+                    addnstr(y, PAGE_PAD, text, width, attr)
+                    clrtoeol()
+            except curses.error:
+                pass
 
-        # ── Status bar ──
-        if is_running:
-            frame = int(time.time() * 4) % 4
-            last_spinner_frame = frame
-            dots = "·" * (frame + 1)
+    def _draw_status(stdscr, W, status_y):
+        """Bottom status bar: spinner while a worker runs, key hints otherwise."""
+        nonlocal spinner_y
+        if running_ev.is_set():
             label = running_label or "working"
-            status = f"  {dots} {label}"
+            status = f"{' ' * SPINNER_X}{SPINNER_FRAMES[spinner_frame]} {label}"
+            spinner_y = status_y
         else:
-            status = f"  {HINT_PAGE}"
+            status = STATUS_PAGES[current_pane]
+            spinner_y = None
         try:
-            stdscr.addstr(status_y, 0, status[:W].ljust(W), COLORS.get('status', curses.A_DIM))
+            stdscr.addstr(status_y, 0, fit_line(status, W), C_STATUS)
         except curses.error:
             pass
 
+    def draw_spinner_only():
+        """Spinner tick: rewrite just the spinner cells of the painted status bar."""
+        nonlocal last_draw
+        try:
+            stdscr.addstr(spinner_y, SPINNER_X, SPINNER_FRAMES[spinner_frame], C_STATUS)
+        except curses.error:
+            pass
+        stdscr.noutrefresh()
+        curses.doupdate()
+        last_draw = time.monotonic()
+
+    def confirm_cleanup(files, dirs):
+        """Main thread: confirm the scanned cleanup targets, then remove them in a worker."""
+        if action_thread:
+            action_thread.join()  # the scan worker is only finishing its bookkeeping
+        targets_preview = [*files, *dirs]
+        if not targets_preview:
+            ui_events.put(("toast", False, f"{ICONS['warn']} Nothing to remove", ["No targets from selected packages"]))
+            return
+        if not confirm_remove_dialog(stdscr, targets_preview):
+            logger("info", "Cleanup cancelled")
+            return
+
+        def do_cleanup():
+            return selective_cleanup_worker(files, dirs, logger)
+
+        def after_cleanup(summary):
+            dry = summary.get('dry_run')
+            fr = summary.get('files_removed', 0)
+            dr = summary.get('dirs_removed', 0)
+            sk = summary.get('skipped', 0)
+            er = summary.get('errors', 0)
+            t = f"{ICONS['success']} Cleanup complete" if er == 0 else f"{ICONS['warn']} Cleanup had issues"
+            sfx = " [DRY]" if dry else ""
+            ui_events.put(("toast", er > 0, t, [f"files {fr}, dirs {dr}, skipped {sk}, errors {er}{sfx}"]))
+
+        run_async("Cleaning…", do_cleanup, on_success=after_cleanup)
+
     def run_async(name, func, on_success=None):
         """Run function asynchronously; worker is headless (no curses)."""
-        nonlocal action_thread, is_running, running_label
+        nonlocal action_thread, running_label
         if action_thread and action_thread.is_alive():
             logger("warn", "Operation already running")
             return
         log.clear()
         logger("info", f"Starting {name}...")
-        is_running = True
         running_label = name
+        running_ev.set()
         draw()
 
         def wrapper():
-            nonlocal is_running, running_label
+            nonlocal running_label
             try:
                 result = func()
                 if callable(on_success):
@@ -1069,8 +1659,10 @@ def main(stdscr):
                 logger("error", f"{name} failed: {e}")
                 ui_events.put(("toast", True, f"{ICONS['error']} {name} Failed", [str(e), "Check the log panel"]))
             finally:
-                is_running = False
                 running_label = None
+                running_ev.clear()
+                # Wake the main loop for one final status paint
+                ui_events.put(("redraw",))
 
         action_thread = threading.Thread(target=wrapper, daemon=True)
         action_thread.start()
@@ -1090,13 +1682,12 @@ def main(stdscr):
             return
 
         # Build command
-        selected_list = sorted(selected_stow)
-        cmd_parts = ["stow", "-v", "-R", "-t", "$HOME"] + [shlex.quote(pkg) for pkg in selected_list]
-        cmd = " ".join(cmd_parts)
+        selected_list = selected_stow_sorted()
+        cmd = ["stow", "-v", "-R", "-t", HOME_STR, *selected_list]
 
         logger("info", f"Stowing {len(selected_list)} packages...")
 
-        exit_code = run_cmd(cmd, logger, cwd=str(STOW_DIR))
+        exit_code = run_cmd(cmd, logger, cwd=str(STOW_DIR), log_lines=log.add_many)
 
         if exit_code != 0:
             raise Exception(f"Stow failed with exit code {exit_code}")
@@ -1112,7 +1703,11 @@ def main(stdscr):
         logger("info", f"Installing {len(selected_list)} packages...")
         def ops_logger(msg):
             logger("info", str(msg))
-        ensure_packages(selected_list, logger=ops_logger)
+        try:
+            ensure_packages(selected_list, logger=ops_logger)
+        except Exception:
+            forget_sudo_cache()  # the sudo timestamp may be why it failed
+            raise
         logger("success", "System packages installed")
         return selected_list
 
@@ -1122,18 +1717,10 @@ def main(stdscr):
             logger("warn", "No plugins selected")
             return
 
-        # Filter config to only selected plugins
+        # Filter config to only selected plugins (non-plugin repos always kept, cfg order)
         cfg_filtered = dict(cfg)
-        filtered_repos = []
-
-        for repo in cfg.get('repos', []):
-            dest = repo.get('dest', '')
-            if '/.oh-my-zsh/custom/plugins/' in dest:
-                plugin_name = dest.split('/.oh-my-zsh/custom/plugins/')[-1]
-                if plugin_name in selected_plugins:
-                    filtered_repos.append(repo)
-            else:
-                filtered_repos.append(repo)
+        filtered_repos = [repo for repo, name in zip(repos, repo_plugin_names)
+                          if name is None or name in selected_plugins]
 
         cfg_filtered['repos'] = filtered_repos
         logger("info", f"Cloning {len(filtered_repos)} repositories...")
@@ -1158,29 +1745,71 @@ def main(stdscr):
     # Main event loop
     while True:
         try:
-            # Drain UI events first (toasts, etc.)
-            try:
-                while True:
-                    kind, is_error, title, lines = ui_events.get_nowait()
-                    if kind == "toast":
-                        toast(stdscr, title, lines, is_error=is_error)
-                        stdscr.getch()
-                        log.clear()
-                        log.dirty = True
-                        suppress_enter_once = True
-            except queue.Empty:
-                pass
-
-            c = stdscr.getch()
+            # Drain UI events first (toasts, etc.) as one batch, bounded by a frame budget
+            # so a burst from a worker is applied together instead of one per loop tick
+            # (the clock is only read once there is something to drain)
+            drained = []
+            deadline = None
+            while True:
+                try:
+                    drained.append(ui_events.get_nowait())
+                except queue.Empty:
+                    break
+                t = time.monotonic()
+                if deadline is None:
+                    deadline = t + UI_DRAIN_BUDGET
+                elif t >= deadline:
+                    break
+            for event in drained:
+                kind = event[0]
+                if kind == "toast":
+                    _, is_error, title, lines = event
+                    # Overlaid by draw(); the loop keeps draining the log and spinner meanwhile
+                    toast_active = (title, lines, is_error)
+                    pending.add('full')
+                elif kind == "confirm_remove":
+                    targets = event[1]
+                    confirm_cleanup(targets["files"], targets["dirs"])
+                    pending.add('full')  # the dialog painted outside draw()
+                elif kind == "redraw":
+                    pending.add('status')
+                    log.dirty = True  # show any lines still held back by batching
+
+            if queued_keys:
+                c = queued_keys.popleft()
+            else:
+                wait_ms = idle_timeout()
+                stdscr.timeout(wait_ms)
+                c = stdscr.getch()
+                # Pull in the rest of a key-repeat/paste burst so it is applied before one draw
+                if c in BATCH_KEYS:
+                    stdscr.nodelay(True)
+                    while (k := stdscr.getch()) != -1:
+                        queued_keys.append(k)
+                        if k not in BATCH_KEYS:
+                            break
+                    stdscr.timeout(wait_ms)
         except KeyboardInterrupt:
             break
 
-        # Help overlay: any key dismisses
+        # Toast / help overlay: any key dismisses (and is consumed)
+        if toast_active and c != -1:
+            if not toast_active[2]:
+                log.clear()  # an error toast points at the log, so that one is kept
+            toast_active = None
+            pending.add('full')
+            c = -1
         if show_help:
             if c != -1:
                 show_help = False
                 draw()
             if show_help:
+                # Keys are swallowed while help is up, but a frame deferred by the
+                # draw interval (e.g. the one that opens the overlay) still goes out
+                log.flush_due()
+                if pending and time.monotonic() - last_draw >= MIN_DRAW_INTERVAL:
+                    draw()
+                    pending.clear()
                 continue
 
         # ────── Menu view ──────
@@ -1211,24 +1840,20 @@ def main(stdscr):
             elif c in (curses.KEY_UP, ord('k')):
                 idx = max(0, idx - 1)
             elif c in (curses.KEY_DOWN, ord('j')):
-                _, _, current_filtered = get_current_data()
-                idx = min(max(0, len(current_filtered) - 1), idx + 1)
+                idx = clamp_idx(idx + 1)
             elif c == curses.KEY_HOME:
                 idx = 0
             elif c == curses.KEY_END:
-                _, _, current_filtered = get_current_data()
-                idx = max(0, len(current_filtered) - 1)
+                idx = clamp_idx(len(panes_state[current_pane].filt))
             elif c == curses.KEY_PPAGE:
-                _, _, current_filtered = get_current_data()
-                if len(current_filtered) > 10:
+                if len(panes_state[current_pane].filt) > 10:
                     idx = max(0, idx - 10)
                 else:
-                    log.scroll = min(len(log.lines), log.scroll + 10)
+                    log.scroll = min(len(log.texts), log.scroll + 10)
                     log.follow = False
             elif c == curses.KEY_NPAGE:
-                _, _, current_filtered = get_current_data()
-                if len(current_filtered) > 10:
-                    idx = min(max(0, len(current_filtered) - 1), idx + 10)
+                if len(panes_state[current_pane].filt) > 10:
+                    idx = clamp_idx(idx + 10)
                 else:
                     log.scroll = max(0, log.scroll - 10)
                     if log.scroll == 0:
@@ -1236,33 +1861,34 @@ def main(stdscr):
 
             # Selection
             elif c == ord(' '):
-                _, current_selected, current_filtered = get_current_data()
-                if current_filtered and idx < len(current_filtered):
-                    item = current_filtered[idx]
-                    if item in current_selected:
-                        current_selected.remove(item)
+                pane = panes_state[current_pane]
+                if idx < len(pane.filt):
+                    item = pane.filt[idx]
+                    if sel_flags[idx]:
+                        pane.sel.remove(item)
                     else:
-                        current_selected.add(item)
+                        pane.sel.add(item)
+                    sel_flags[idx] = not sel_flags[idx]
+                    sel_version += 1
             elif c in (ord('A'), ord('a')):
-                _, current_selected, current_filtered = get_current_data()
-                current_selected.update(current_filtered)
+                pane = panes_state[current_pane]
+                pane.sel.update(pane.filt)
+                sel_flags = [True] * len(pane.filt)
+                sel_version += 1
             elif c in (ord('U'), ord('u')):
-                _, current_selected, current_filtered = get_current_data()
-                for item in current_filtered:
-                    current_selected.discard(item)
+                pane = panes_state[current_pane]
+                pane.sel.difference_update(pane.filt)
+                sel_flags = [False] * len(pane.filt)
+                sel_version += 1
             elif c in (ord('I'), ord('i')):
-                _, current_selected, current_filtered = get_current_data()
-                for item in current_filtered:
-                    if item in current_selected:
-                        current_selected.remove(item)
-                    else:
-                        current_selected.add(item)
+                pane = panes_state[current_pane]
+                pane.sel.symmetric_difference_update(pane.filt)
+                sel_flags = [not f for f in sel_flags]
+                sel_version += 1
 
             # Run action
             elif c in (10, 13):
-                if suppress_enter_once:
-                    suppress_enter_once = False
-                elif not is_running:
+                if not running_ev.is_set():
                     if current_pane == 0:
                         run_async("Stow packages", stow_selected)
                     elif current_pane == 1:
@@ -1291,16 +1917,17 @@ def main(stdscr):
 
             elif c == ord('r'):
                 cfg = load_config()
+                stow_targets_cached.cache_clear()  # package trees may have changed on disk
                 stow_pkgs = list_packages()
                 themes_map = discover_themes()
                 theme_names = sorted(themes_map.keys())
                 sys_pkgs = package_plan(cfg)
-                plugin_repos = [r for r in cfg.get("repos", []) if "/.oh-my-zsh/custom/plugins/" in r.get("dest", "")]
-                plugins = [r["dest"].split("/.oh-my-zsh/custom/plugins/")[-1] for r in plugin_repos]
-                selected_stow &= set(stow_pkgs)
-                selected_themes &= set(theme_names)
-                selected_pkgs &= set(sys_pkgs)
-                selected_plugins &= set(plugins)
+                repos, repo_plugin_names = index_repos(cfg)
+                plugins = [n for n in repo_plugin_names if n is not None]
+                # set_items() also drops selections that no longer exist
+                for pane, items in zip(panes_state, (stow_pkgs, theme_names, sys_pkgs, plugins)):
+                    pane.set_items(items)
+                sel_version += 1
                 apply_filter()
                 logger("info", "Refreshed")
             elif c == ord('c'):
@@ -1312,26 +1939,48 @@ def main(stdscr):
                 try:
                     H, W = stdscr.getmaxyx()
                     prompt = "/ "
-                    stdscr.addstr(H - 1, 0, prompt.ljust(W), curses.A_DIM)
-                    stdscr.refresh()
+                    safe_addstr(stdscr, H - 1, 0, prompt, curses.A_DIM)
+                    stdscr.clrtoeol()
+                    stdscr.noutrefresh()
+                    curses.doupdate()
                     filter_input = filter_text
-                    while True:
+                    done = False
+                    while not done:
                         fc = stdscr.getch()
-                        if fc in (10, 13):
-                            break
-                        elif fc == 27:
-                            filter_input = ""
-                            break
-                        elif fc in (curses.KEY_BACKSPACE, 127, 8):
-                            if filter_input:
-                                filter_input = filter_input[:-1]
-                        elif 32 <= fc <= 126:
-                            filter_input += chr(fc)
-                        display = f"{prompt}{filter_input}".ljust(W)
-                        stdscr.addstr(H - 1, 0, display, curses.A_DIM)
-                        stdscr.refresh()
-                    filter_text = filter_input
-                    apply_filter()
+                        if fc == -1:
+                            continue
+                        # Drain pasted/repeated keys so one batch costs one filter pass and one refresh
+                        batch = [fc]
+                        stdscr.nodelay(True)
+                        try:
+                            while (fc := stdscr.getch()) != -1:
+                                batch.append(fc)
+                        finally:
+                            stdscr.timeout(100)
+                        for fc in batch:
+                            if fc in (10, 13):
+                                done = True
+                                break
+                            elif fc == 27:
+                                filter_input = ""
+                                done = True
+                                break
+                            elif fc in (curses.KEY_BACKSPACE, 127, 8):
+                                if filter_input:
+                                    filter_input = filter_input[:-1]
+                            elif 32 <= fc <= 126:
+                                filter_input += chr(fc)
+                        if filter_input != filter_text:
+                            # Live update; a longer filter narrows the current matches
+                            prev, filter_text = filter_text, filter_input
+                            apply_filter(prev)
+                            if not done:
+                                draw(flush=False)  # the prompt below completes this frame
+                        if not done:
+                            safe_addstr(stdscr, H - 1, 0, prompt + filter_input, curses.A_DIM)
+                            stdscr.clrtoeol()
+                            stdscr.noutrefresh()
+                            curses.doupdate()
                 finally:
                     curses.curs_set(0)
 
@@ -1346,63 +1995,55 @@ def main(stdscr):
                 log.scroll = 0
 
             # Selective cleanup (D) — stow page only
-            elif c == ord('D') and current_pane == 0 and not is_running:
+            elif c == ord('D') and current_pane == 0 and not running_ev.is_set():
                 if not selected_stow:
                     ui_events.put(("toast", False, f"{ICONS['warn']} No stow packages selected", ["Select packages first"]))
                 else:
-                    selected_list = sorted(selected_stow)
+                    selected_list = selected_stow_sorted()
                     if not STOW_DIR.exists():
                         ui_events.put(("toast", True, f"{ICONS['error']} Missing stow directory", [str(STOW_DIR)]))
                     else:
-                        files, dirs = enumerate_stow_targets_for_pkgs(selected_list)
-                        targets_preview = files + dirs
-                        if not targets_preview:
-                            ui_events.put(("toast", False, f"{ICONS['warn']} Nothing to remove", ["No targets from selected packages"]))
-                        else:
-                            if confirm_remove_dialog(stdscr, targets_preview):
-                                def do_cleanup():
-                                    return selective_cleanup_worker(files, dirs, logger)
-
-                                def after_cleanup(summary):
-                                    dry = summary.get('dry_run')
-                                    fr = summary.get('files_removed', 0)
-                                    dr = summary.get('dirs_removed', 0)
-                                    sk = summary.get('skipped', 0)
-                                    er = summary.get('errors', 0)
-                                    t = f"{ICONS['success']} Cleanup complete" if er == 0 else f"{ICONS['warn']} Cleanup had issues"
-                                    sfx = " [DRY]" if dry else ""
-                                    ui_events.put(("toast", er > 0, t, [f"files {fr}, dirs {dr}, skipped {sk}, errors {er}{sfx}"]))
-
-                                run_async("Cleaning…", do_cleanup, on_success=after_cleanup)
-                            else:
-                                logger("info", "Cleanup cancelled")
-
-        # Decide if redraw needed
-        need_draw = False
-        spinner_frame_changed = False
-        if is_running:
-            frame = int(time.time() * 4) % 4
-            if frame != last_spinner_frame:
-                spinner_frame_changed = True
-                last_spinner_frame = frame
-        user_input = c != -1
-        log_update = log.dirty
-        if user_input or log_update or spinner_frame_changed:
-            need_draw = True
-        if need_draw:
-            now = time.time()
-            only_log = (not user_input) and log_update and not show_help and not spinner_frame_changed
-            only_spinner = spinner_frame_changed and not user_input and not log_update and not show_help
-            if only_log and now - last_log_redraw_time < LOG_REDRAW_INTERVAL:
-                pass
+                        # Walk the package trees off the UI thread; the dialog opens
+                        # from the ui_events drain once the targets are known
+                        run_async("Scanning targets", functools.partial(stow_targets_cached, selected_list),
+                                  on_success=lambda r: ui_events.put(("confirm_remove", {"files": r[0], "dirs": r[1]})))
+
+        # Collect draw causes; repaint at most once per MIN_DRAW_INTERVAL
+        now = time.monotonic()  # the one clock sample of an idle tick
+        if running_ev.is_set() and now - spinner_t >= spinner_period:
+            spinner_frame = (spinner_frame + 1) % 4
+            spinner_t = now
+            pending.add('spinner')
+        if c != -1:
+            pending.add('full' if c in FULL_DRAW_KEYS else 'keys')
+        log.flush_due()
+        if log.dirty:
+            pending.add('log')
+        state = ui_state()
+        if pending == {'keys'} and state == last_ui_state:
+            pending.clear()  # e.g. unbound key, or j at the last row
+        if pending and not queued_keys and now - last_draw >= MIN_DRAW_INTERVAL:
+            overlay = show_help or toast_active
+            if pending == {'spinner'} and spinner_y is not None and not overlay:
+                draw_spinner_only()
             else:
-                if only_log:
-                    draw(partial=True)
-                    last_log_redraw_time = now
-                elif only_spinner:
-                    draw(partial=True)
+                if 'full' in pending or overlay:
+                    regions = None
+                elif 'keys' in pending:
+                    regions = changed_regions(last_ui_state, state)
                 else:
+                    regions = set()
+                if regions is None:
                     draw()
+                else:
+                    # Log bursts are already throttled at the source (LogBuf batching)
+                    regions |= pending & {'log', 'status'}
+                    if 'spinner' in pending:
+                        regions.add('status')
+                    for region in regions:
+                        dirty[region] = True
+                    draw(partial=True)
+            pending.clear()
 
 if __name__ == "__main__":  # safety fallback if run directly
     curses.wrapper(main)
@@ -1,55 +1,109 @@
-import os, subprocess, shlex, pathlib, errno
+import os, subprocess, shlex, pathlib, errno, functools, stat, collections, threading, time, shutil
+import concurrent.futures
+from datetime import datetime
 from typing import Callable, List, Tuple, Dict, Any
-try:
-    import yaml  # type: ignore
-except Exception:  # ModuleNotFoundError or any import issue
-    yaml = None  # will be installed lazily
+yaml = None  # PyYAML, imported (and installed if missing) on first use by _import_yaml()
 
 HERE = pathlib.Path(__file__).resolve().parent
 ROOT = HERE.parent
 CONFIG = ROOT / "config.yaml"
 STOW_DIR = ROOT / "stow"
+HOME = pathlib.Path(os.path.expanduser("~"))
+BACKUP_ROOT = HOME / ".dotfiles_backup"
+BACKUP_TS_FMT = "%Y%m%d%H%M%S"
+PACMAN_SYNC_DIR = pathlib.Path("/var/lib/pacman/sync")
+SYNC_MAX_AGE = 15 * 60  # seconds a `pacman -Sy` stays fresh enough to skip another
 Logger = Callable[[str], None]
 
-def run(cmd, sudo=False, check=True, env=None, logger: Logger | None = None):
-    """Run a command streaming output line-by-line to logger (or print)."""
+def run(cmd, sudo=False, check=True, env=None, logger: Logger | None = None, cwd=None):
+    """Run a command streaming output line-by-line to logger (or print).
+
+    cmd is an argv list, executed without a shell; a string is still run
+    through /bin/sh for callers that need shell syntax (e.g. `post` hooks).
+    """
+    shell = isinstance(cmd, str)
+    sudo_password = None
     if sudo and os.geteuid() != 0:
-        # Use stored password if available
+        # Use stored password if available; sudo -S reads it from our stdin pipe
         sudo_password = os.environ.get('SUDO_PASSWORD')
-        if sudo_password:
-            cmd = f"echo '{sudo_password}' | sudo -S -E {cmd}"
-        else:
-            cmd = f"sudo -E {cmd}"
+        prefix = ["sudo", "-S", "-E"] if sudo_password else ["sudo", "-E"]
+        cmd = f"{shlex.join(prefix)} {cmd}" if shell else [*prefix, *cmd]
+    shown = cmd if shell else shlex.join(cmd)
     if logger is None:
         logger = print  # type: ignore
-    logger(f"[cmd] {cmd}")
-    proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                            env=env, text=True, bufsize=1)
-    collected: List[str] = []
-    for raw in proc.stdout or []:  # type: ignore
-        line = raw.rstrip('\n')
-        collected.append(line)
-        logger(line)
+    logger(f"[cmd] {shown}")
+    try:
+        proc = subprocess.Popen(cmd, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                stdin=subprocess.PIPE if sudo_password else None,
+                                env=env, cwd=cwd, bufsize=-1)
+    except FileNotFoundError as e:
+        # What a shell reports for a missing program, so check=False callers carry on
+        logger(f"[exit 127] {shown}: {e.strerror}")
+        if check:
+            raise RuntimeError(f"Command failed (exit 127): {shown}: {e.strerror}")
+        return 127
+    if sudo_password:
+        proc.stdin.write(sudo_password.encode() + b"\n")  # type: ignore
+        proc.stdin.close()  # type: ignore
+    # Raw pipe read in chunks; read_output_lines splits like text mode did
+    collected: collections.deque[str] = collections.deque(maxlen=40)
+    with proc.stdout:  # type: ignore
+        for lines in read_output_lines(proc.stdout.fileno()):  # type: ignore
+            for line in lines:
+                collected.append(line)
+                logger(line)
     proc.wait()
     rc = proc.returncode
-    logger(f"[exit {rc}] {cmd}")
+    logger(f"[exit {rc}] {shown}")
     if check and rc != 0:
-        tail = '\n'.join(collected[-40:])  # include last 40 lines for context
-        raise RuntimeError(f"Command failed (exit {rc}): {cmd}\n--- output tail ---\n{tail}")
+        tail = '\n'.join(collected)  # include last 40 lines for context
+        raise RuntimeError(f"Command failed (exit {rc}): {shown}\n--- output tail ---\n{tail}")
     return rc
 
+def read_output_lines(fd):
+    """Yield the lines read from a raw pipe fd, one list per 64K os.read chunk, until EOF.
+
+    Splits like a text-mode pipe's universal newlines: CRLF and a lone CR
+    (progress bars) both end a line. A trailing CR is held back in case its LF
+    arrives with the next chunk. Undecodable bytes are replaced.
+    """
+    pending = b""
+    while chunk := os.read(fd, 65536):
+        data = pending + chunk
+        cut = len(data) - 1 if data.endswith(b"\r") else len(data)
+        *lines, pending = data[:cut].replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+        pending += data[cut:]
+        if lines:
+            yield [raw.decode("utf-8", "replace") for raw in lines]
+    if pending:
+        yield [pending.rstrip(b"\r").decode("utf-8", "replace")]
+
+@functools.lru_cache(maxsize=None)
 def which(bin_name):
-    return subprocess.call(f"command -v {shlex.quote(bin_name)} >/dev/null 2>&1", shell=True) == 0
+    """True if bin_name is on PATH; cached, so call which.cache_clear() after installing it."""
+    return shutil.which(bin_name) is not None
+
+def _import_yaml():
+    """Bind the module-global yaml if PyYAML is importable; True on success."""
+    global yaml
+    if yaml is None:
+        try:
+            import yaml as _yaml  # type: ignore
+        except Exception:  # ModuleNotFoundError or any import issue
+            return False
+        yaml = _yaml
+    return True
 
 def load_config():
     """Load YAML config, installing PyYAML on demand if missing.
 
     This keeps the module importable on systems without PyYAML yet, allowing
     ensure_python_yaml() to run first. Idempotent: once installed, subsequent
-    calls reuse the imported module.
+    calls reuse the imported module. The parsed config is cached until
+    config.yaml's mtime changes; callers share it, so treat it as read-only.
     """
     global yaml
-    if yaml is None:
+    if not _import_yaml():
         # Attempt installation then import again
         try:
             ensure_python_yaml()
@@ -61,8 +115,15 @@ def load_config():
             yaml = _yaml
         except Exception as e:
             raise RuntimeError("Unable to import PyYAML after installation attempt: " + str(e))
+    return _parse_config(CONFIG.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=4)
+def _parse_config(mtime_ns):
+    """Parse config.yaml; mtime_ns only keys the cache so an edited file is re-read."""
+    # libyaml-backed loader when PyYAML was built with it; same safe semantics
+    Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(CONFIG, "r") as f:
-        return yaml.safe_load(f) or {}
+        return yaml.load(f, Loader=Loader) or {}
 
 def detect_distro():
     """Kept for backward compatibility but unused. Arch is assumed."""
@@ -71,49 +132,83 @@ def detect_distro():
 def ensure_packages(pkgs, logger: Logger | None = None):
     """Install packages on Arch Linux.
 
-    - Sync pacman database.
+    - Skip packages already installed (one `pacman -Qq` read of the local DB).
+    - Sync pacman database, unless it was synced within SYNC_MAX_AGE
+      (set DOTFILES_FORCE_SYNC=1 to always sync).
     - Install official repo packages via pacman.
-    - If AUR packages are present and yay/paru exists, install them via that helper.
-      Otherwise log a warning.
+    - If AUR packages are present and yay/paru exists, install everything in one
+      call to that helper. Otherwise log a warning.
     """
     if not pkgs:
         return []
 
     log = logger or print  # type: ignore
 
-    # Always refresh pacman databases first
-    run("pacman -Sy --noconfirm", sudo=True, logger=logger)
+    # Re-runs usually find everything installed; then there is nothing to sync or resolve
+    installed = installed_package_names()
+    missing = [p for p in pkgs if p.rpartition("/")[2] not in installed]
+    if len(missing) < len(pkgs):
+        log(f"[ok] {len(pkgs) - len(missing)} of {len(pkgs)} packages already installed")
+    if not missing:
+        return pkgs
+
+    # Refresh pacman databases first unless a recent sync already did
+    if os.environ.get("DOTFILES_FORCE_SYNC") != "1" and sync_db_fresh():
+        log("[ok] pacman databases synced recently; skipping -Sy")
+    else:
+        run(["pacman", "-Sy", "--noconfirm"], sudo=True, logger=logger)
 
-    # Partition into official vs potential AUR by probing pacman -Si
+    # Partition into official vs potential AUR against one listing of the sync repos
+    official_set = sync_package_names()
     official: list[str] = []
     aur: list[str] = []
-    for p in pkgs:
-        try:
-            rc = subprocess.call(f"pacman -Si {shlex.quote(p)} >/dev/null 2>&1", shell=True)
-            if rc == 0:
-                official.append(p)
-            else:
-                aur.append(p)
-        except Exception:
-            aur.append(p)
-
-    if official:
-        run(f"pacman -S --needed --noconfirm {' '.join(shlex.quote(p) for p in official)}", sudo=True, logger=logger)
+    for p in missing:
+        # "repo/pkg" names are accepted by pacman -S too
+        (official if p.rpartition("/")[2] in official_set else aur).append(p)
 
+    helper = None
     if aur:
-        helper = None
         if which("yay"):
             helper = "yay"
         elif which("paru"):
             helper = "paru"
-        if helper:
-            # AUR helpers handle privilege escalation internally; do not pass sudo
-            run(f"{helper} -S --needed --noconfirm {' '.join(shlex.quote(p) for p in aur)}", sudo=False, logger=logger)
-        else:
+        if not helper:
             log(f"[warn] AUR helper not found (yay/paru). Unable to install: {' '.join(aur)}")
 
+    if helper:
+        # The helper resolves repo and AUR packages in one transaction, so pacman
+        # runs once; AUR helpers handle privilege escalation internally, no sudo
+        run([helper, "-S", "--needed", "--noconfirm", *official, *aur], sudo=False, logger=logger)
+    elif official:
+        run(["pacman", "-S", "--needed", "--noconfirm", *official], sudo=True, logger=logger)
+
     return pkgs
 
+def sync_package_names():
+    """Names of all packages in the synced pacman repos (`pacman -Slq`); empty on failure."""
+    try:
+        out = subprocess.check_output(["pacman", "-Slq"], text=True, stderr=subprocess.DEVNULL)
+    except Exception:
+        return set()
+    return set(out.split())
+
+def sync_db_fresh(max_age: float = SYNC_MAX_AGE) -> bool:
+    """True if every repo DB under PACMAN_SYNC_DIR was refreshed within max_age seconds."""
+    try:
+        with os.scandir(PACMAN_SYNC_DIR) as it:
+            mtimes = [e.stat().st_mtime for e in it if e.name.endswith(".db")]
+    except OSError:
+        return False
+    return bool(mtimes) and time.time() - min(mtimes) < max_age
+
+def installed_package_names():
+    """Names of all installed packages, AUR/foreign included (`pacman -Qq`); empty on failure."""
+    try:
+        out = subprocess.check_output(["pacman", "-Qq"], text=True, stderr=subprocess.DEVNULL)
+    except Exception:
+        return set()
+    return set(out.split())
+
 def package_plan(cfg):
     """Return list of packages to install.
 
@@ -133,20 +228,69 @@ def package_plan(cfg):
     if isinstance(section, dict):
         common = section.get("common", []) or []
         arch_specific = section.get("arch", []) or []
-        seen, out = set(), []
-        for p in (list(common) + list(arch_specific)):
-            if p not in seen:
-                seen.add(p)
-                out.append(p)
-        return out
+        return list(dict.fromkeys([*common, *arch_specific]))  # ordered dedup
     return []
 
 def ensure_stow(logger: Logger | None = None):
     if not which("stow"):
         try:
-            run("pacman -Sy --noconfirm stow", sudo=True, logger=logger)
+            run(["pacman", "-Sy", "--noconfirm", "stow"], sudo=True, logger=logger)
         except RuntimeError:
             raise RuntimeError("Install stow manually first")
+        which.cache_clear()
+
+def backup(target: pathlib.Path, logger: Logger | None = None):
+    """Move a conflicting file into BACKUP_ROOT as <name>.orig (timestamped if taken)."""
+    dest = BACKUP_ROOT / f"{target.name}.orig"
+    if dest.exists():
+        dest = BACKUP_ROOT / f"{target.name}.orig.{datetime.now().strftime(BACKUP_TS_FMT)}"
+    try:
+        target.rename(dest)
+        (logger or print)(f"[backup] {target} -> {dest}")
+    except Exception as e:
+        (logger or print)(f"[warn] backup failed {target}: {e}")
+
+def iter_pkg_files(root: str, rel: str = ""):
+    """Yield (path, rel) for each non-directory under root, recursing with os.scandir.
+
+    Matches Path.rglob('*') filtered on is_dir(): a symlink to a directory counts
+    as a directory and is neither yielded nor descended into. DirEntry caches the
+    type from readdir, so no per-entry stat is needed. Anything named .git is
+    pruned here, so a checkout's object store is never walked at all.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for e in entries:
+        if e.name == ".git":
+            continue
+        r = os.path.join(rel, e.name) if rel else e.name
+        if e.is_dir():
+            if not e.is_symlink():
+                yield from iter_pkg_files(e.path, r)
+        else:
+            yield e.path, r
+
+def target_kind(p) -> str | None:
+    """Classify p with one os.lstat: "symlink", "dir", "file", "other", or None if absent."""
+    try:
+        m = os.lstat(p).st_mode
+    except OSError:
+        return None
+    if stat.S_ISLNK(m):
+        return "symlink"
+    return "dir" if stat.S_ISDIR(m) else "file" if stat.S_ISREG(m) else "other"
+
+def _link_dest(link) -> str | None:
+    """Where symlink `link` points, as a normalized absolute path: one readlink and
+    no realpath walk over every parent. None if it cannot be read."""
+    try:
+        dest = os.readlink(link)
+    except OSError:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(link), dest))
 
 def do_stow(cfg, target_home=True, dry=False, logger: Logger | None = None):
     """Safely stow selected packages.
@@ -170,68 +314,56 @@ def do_stow(cfg, target_home=True, dry=False, logger: Logger | None = None):
     # Native stow path (previous logic) guarded by env flag
     if use_native_stow:
         ensure_stow(logger=logger)
-        home = pathlib.Path(os.path.expanduser("~")) if target_home else STOW_DIR.parent
+        home = HOME if target_home else STOW_DIR.parent
 
         def iter_package_entries():
             for pkg in packages:
-                root = STOW_DIR / pkg
-                for path in root.rglob('*'):
-                    if path.is_dir():
-                        continue
-                    rel = path.relative_to(root)
+                for path, rel in iter_pkg_files(str(STOW_DIR / pkg)):
                     yield pkg, path, rel
 
-        backup_root = pathlib.Path(os.path.expanduser("~/.dotfiles_backup"))
-        backup_root.mkdir(parents=True, exist_ok=True)
-
-        def backup_file(target_path: pathlib.Path):
-            from datetime import datetime
-            rel_name = target_path.name
-            dest = backup_root / f"{rel_name}.orig"
-            if dest.exists():
-                ts = datetime.now().strftime("%Y%m%d%H%M%S")
-                dest = backup_root / f"{rel_name}.orig.{ts}"
-            try:
-                target_path.rename(dest)
-                (logger or print)(f"[backup] {target_path} -> {dest}")
-            except Exception as e:
-                (logger or print)(f"[warn] backup failed {target_path}: {e}")
+        BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
 
         seen_conflicts = 0
+        home_prefix = os.path.join(str(home), "")
         for _pkg, _path, rel in iter_package_entries():
-            target_path = home / rel
-            if not target_path.exists():
-                continue
-            if target_path.is_symlink():
+            target_path = home_prefix + rel
+            # One lstat for exists/is_symlink/is_file; dangling links count as absent
+            kind = target_kind(target_path)
+            if kind == "symlink":
+                if not os.path.exists(target_path):
+                    continue
+                # Links we made point straight into STOW_DIR; resolve() only otherwise
+                if (_link_dest(target_path) or "").startswith(str(STOW_DIR)):
+                    continue
                 try:
-                    real = target_path.resolve()
-                    if str(real).startswith(str(STOW_DIR)):
+                    if os.path.realpath(target_path).startswith(str(STOW_DIR)):
                         continue
                 except Exception:
                     pass
-                backup_file(target_path); seen_conflicts += 1; continue
-            if target_path.is_file():
-                backup_file(target_path); seen_conflicts += 1
+                backup(pathlib.Path(target_path), logger); seen_conflicts += 1; continue
+            if kind == "file":
+                backup(pathlib.Path(target_path), logger); seen_conflicts += 1
         if seen_conflicts:
             (logger or print)(f"[info] backed up {seen_conflicts} conflicting files")
-        pkgs_str = ' '.join(shlex.quote(p) for p in packages)
         simulate = os.environ.get("DOTFILES_STOW_DRY_RUN") == "1"
-        base_cmd = "stow -v -R" + (" -n" if simulate else "")
-        cmd = f"{base_cmd} -t $HOME {pkgs_str}" if target_home else f"{base_cmd} {pkgs_str}"
+        # argv run with cwd=STOW_DIR: no shell, no `cd`; without -t stow targets STOW_DIR's parent
+        argv = ["stow", "-v", "-R", *(["-n"] if simulate else []),
+                *(["-t", str(home)] if target_home else []), *packages]
+        cmd = shlex.join(argv)
         if dry:
             (logger or print)(f"[dry] {cmd} (cwd={STOW_DIR})")
         else:
             for p in packages:
                 (logger or print)(f"[stow] package root: {(STOW_DIR/p)}")
             (logger or print)(f"[stow] running aggregated: {cmd}{' (simulate)' if simulate else ''}")
-            env = {**os.environ, "HOME": os.path.expanduser("~"), "PWD": str(STOW_DIR)}
-            run(f"cd {shlex.quote(str(STOW_DIR))} && {cmd}", sudo=False, check=True, env=env, logger=logger)
+            env = {**os.environ, "HOME": str(HOME), "PWD": str(STOW_DIR)}
+            run(argv, sudo=False, check=True, env=env, logger=logger, cwd=str(STOW_DIR))
         return packages
 
     # Safe manual symlink mode (default)
-    home = pathlib.Path(os.path.expanduser("~"))
-    backup_root = pathlib.Path(os.path.expanduser("~/.dotfiles_backup"))
-    backup_root.mkdir(parents=True, exist_ok=True)
+    home = HOME
+    home_prefix = os.path.join(str(home), "")  # "<home>/", for string-joined targets
+    BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
 
     # Warn about multi-app bundling inside a single package's .config directory.
     for pkg in packages:
@@ -262,22 +394,10 @@ def do_stow(cfg, target_home=True, dry=False, logger: Logger | None = None):
     except Exception as e:
         (logger or print)(f"[warn] could not inspect ~/.config symlink: {e}")
 
-    def backup(target: pathlib.Path):
-        from datetime import datetime
-        rel_name = target.name
-        dest = backup_root / f"{rel_name}.orig"
-        if dest.exists():
-            ts = datetime.now().strftime("%Y%m%d%H%M%S")
-            dest = backup_root / f"{rel_name}.orig.{ts}"
-        try:
-            target.rename(dest)
-            (logger or print)(f"[backup] {target} -> {dest}")
-        except Exception as e:
-            (logger or print)(f"[warn] backup failed {target}: {e}")
-
     created, skipped, conflicts = 0,0,0
     adopt_dirs = os.environ.get("DOTFILES_ADOPT") == "1"
     dir_links: set[pathlib.Path] = set()
+    parents_done: set[str] = set()
     for pkg in packages:
         pkg_dir = STOW_DIR / pkg
         (logger or print)(f"[link] processing package {pkg}")
@@ -289,21 +409,22 @@ def do_stow(cfg, target_home=True, dry=False, logger: Logger | None = None):
                     continue
                 rel_dir = child.relative_to(pkg_dir)  # .config/<name>
                 target_dir = home / rel_dir
+                kind = target_kind(target_dir)
                 # If target already correct symlink, skip
-                if target_dir.is_symlink():
+                if kind == "symlink":
                     try:
-                        if target_dir.resolve() == child.resolve():
+                        # Cheap readlink match first; resolve() covers relative/chained links
+                        if _link_dest(target_dir) == str(child) or target_dir.resolve() == child.resolve():
                             skipped += 1
                             dir_links.add(child)
                             continue
                     except Exception:
                         pass
-                if target_dir.exists() and not target_dir.is_symlink():
+                if kind is not None and kind != "symlink":
                     if adopt_dirs:
                         # Back up existing directory then replace with symlink
-                        from datetime import datetime
-                        ts = datetime.now().strftime("%Y%m%d%H%M%S")
-                        backup_path = backup_root / f"{rel_dir.name}.dir.orig.{ts}"
+                        ts = datetime.now().strftime(BACKUP_TS_FMT)
+                        backup_path = BACKUP_ROOT / f"{rel_dir.name}.dir.orig.{ts}"
                         try:
                             target_dir.rename(backup_path)
                             (logger or print)(f"[adopt-backup] {target_dir} -> {backup_path}")
@@ -328,67 +449,55 @@ def do_stow(cfg, target_home=True, dry=False, logger: Logger | None = None):
                 except Exception as e:
                     (logger or print)(f"[error] symlink-dir {target_dir}: {e}")
 
-        for path in pkg_dir.rglob('*'):
-            # Skip any .git directories and their contents
-            if '.git' in path.parts:
-                continue
-            if path.is_dir():
-                continue  # only link files in second pass
-            # Skip files inside directories we already symlinked as a whole
-            try:
-                for d in dir_links:
-                    try:
-                        # Python 3.9+ has is_relative_to; fallback to startswith if missing
-                        rel = False
-                        if hasattr(path, 'is_relative_to'):
-                            rel = path.is_relative_to(d)  # type: ignore[attr-defined]
-                        else:  # pragma: no cover
-                            rel = str(path).startswith(str(d)+os.sep)
-                        if rel:
-                            # (logger or print)(f"[skip-contained] {path} inside {d}")  # verbose debug (disabled)
-                            raise StopIteration  # break both loops
-                    except StopIteration:
-                        raise
-                # normal flow continues if not inside dir_links
-            except StopIteration:
+        # Files inside directories we already symlinked as a whole are skipped;
+        # one str.startswith over all of them instead of a Path check per link
+        dir_link_prefixes = tuple(str(d) + os.sep for d in dir_links)
+        # Second pass links files only; iter_pkg_files never yields directories.
+        # Paths stay plain strings here; a Path is only built to back a file up.
+        for path_s, rel_s in iter_pkg_files(str(pkg_dir)):
+            if path_s.startswith(dir_link_prefixes):
                 continue
-            except Exception:
-                pass
-            rel = path.relative_to(pkg_dir)
             # Never attempt to create a symlink that replaces the root ~/.config directory itself
-            if str(rel) == '.config':  # defensive guard; shouldn't normally happen for files
+            if rel_s == '.config':  # defensive guard; shouldn't normally happen for files
                 (logger or print)(f"[skip] refusing to link top-level .config from {pkg}")
                 skipped += 1
                 continue
-            target = home / rel
-            try:
-                target.parent.mkdir(parents=True, exist_ok=True)
-            except Exception as e:
-                (logger or print)(f"[warn] could not ensure parent dir for {target}: {e}")
-                continue
-            if target.exists() or target.is_symlink():
+            target = home_prefix + rel_s
+            # Most files share a parent; only makedirs each one once per run
+            parent_s = os.path.dirname(target)
+            if parent_s not in parents_done:
+                try:
+                    os.makedirs(parent_s, exist_ok=True)
+                except Exception as e:
+                    (logger or print)(f"[warn] could not ensure parent dir for {target}: {e}")
+                    continue
+                parents_done.add(parent_s)
+            # One lstat answers exists/is_symlink/is_dir (a dangling link still counts)
+            kind = target_kind(target)
+            if kind is not None:
+                is_link = kind == "symlink"
                 # Already correct symlink?
-                if target.is_symlink():
+                if is_link:
                     try:
-                        if target.resolve() == path.resolve():
+                        if _link_dest(target) == path_s or os.path.realpath(target) == os.path.realpath(path_s):
                             skipped += 1
                             continue
                     except Exception:
                         pass
-                if target.is_dir():
+                if kind == "dir" or (is_link and os.path.isdir(target)):
                     # We do not overwrite real directories; user must relocate contents manually if desired
                     (logger or print)(f"[skip-dir] {target} exists as directory; leaving intact")
                     skipped += 1
                     continue
-                backup(target)
+                backup(pathlib.Path(target), logger)
                 conflicts += 1
             if dry:
-                (logger or print)(f"[dry-link] {target} -> {path}")
+                (logger or print)(f"[dry-link] {target} -> {path_s}")
                 continue
             try:
-                target.symlink_to(path)
+                os.symlink(path_s, target)
                 created += 1
-                (logger or print)(f"[symlink] {target} -> {path}")
+                (logger or print)(f"[symlink] {target} -> {path_s}")
             except OSError as e:
                 if e.errno == errno.EEXIST:
                     (logger or print)(f"[exists] {target} already exists; skipped (EEXIST)")
@@ -409,21 +518,53 @@ def ensure_zsh_default(logger: Logger | None = None):
     if "zsh" in current:
         (logger or print)("[ok] default shell already zsh")
         return
-    run(f"chsh -s {zsh} $USER || true", sudo=False, check=False, logger=logger)
+    run(["chsh", "-s", zsh], sudo=False, check=False, logger=logger)  # defaults to the current user
     (logger or print)("[note] You may need to log out/in for default shell to apply.")
 
 def clone_repos(cfg, logger: Logger | None = None):
+    """Clone missing repos, several at a time; results keep cfg order.
+
+    Clones are network-bound and independent, so they overlap on a small pool;
+    each clone's log lines are tagged with its dest dir name so interleaved
+    output stays attributable. If any clone fails the others still finish, then
+    the first failure (in cfg order) is raised as before.
+    """
+    base_logger = logger or print
+    log_lock = threading.Lock()
+
+    def tagged_logger(tag):
+        def log(msg):
+            with log_lock:
+                base_logger(f"[{tag}] {msg}")
+        return log
+
     results: List[Tuple[str,str]] = []
+    jobs: List[Tuple[str, str]] = []
+    claimed = set()
     for repo in cfg.get("repos",[]):
         dest = os.path.expanduser(repo["dest"])
         url = repo["url"]
         pathlib.Path(dest).parent.mkdir(parents=True, exist_ok=True)
-        if pathlib.Path(dest).exists():
-            (logger or print)(f"[skip] {dest}")
+        if dest in claimed or pathlib.Path(dest).exists():
+            base_logger(f"[skip] {dest}")
             results.append((dest, "skipped"))
             continue
-        run(f"git clone --depth 1 {shlex.quote(url)} {shlex.quote(dest)}", logger=logger)
+        claimed.add(dest)
+        jobs.append((url, dest))
         results.append((dest, "cloned"))
+    if not jobs:
+        return results
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+        futures = []
+        for url, dest in jobs:
+            tag = os.path.basename(dest)
+            futures.append((tag, pool.submit(run, ["git", "clone", "--depth", "1", url, dest],
+                                             logger=tagged_logger(tag))))
+    for tag, fut in futures:
+        try:
+            fut.result()
+        except RuntimeError as e:  # first failed clone, tagged like its log lines
+            raise RuntimeError(f"[{tag}] {e}") from e
     return results
 
 def run_post(cfg, logger: Logger | None = None):
@@ -435,14 +576,14 @@ def run_post(cfg, logger: Logger | None = None):
 
 def ensure_python_yaml(logger: Logger | None = None):
     global yaml
-    if yaml is not None:
+    if _import_yaml():
         return
     # Arch: best-effort system package first
-    run("pacman -S --needed --noconfirm python-yaml python-pip || true", sudo=True, check=False, logger=logger)
+    run(["pacman", "-S", "--needed", "--noconfirm", "python-yaml", "libyaml", "python-pip"], sudo=True, check=False, logger=logger)
     # fallback to pip
     # ensure pip exists (some minimal installs lack it)
-    run("python3 -m ensurepip --upgrade || true", sudo=False, check=False, logger=logger)
-    run("python3 -m pip install --user --upgrade pip pyyaml || true", sudo=False, check=False, logger=logger)
+    run(["python3", "-m", "ensurepip", "--upgrade"], sudo=False, check=False, logger=logger)
+    run(["python3", "-m", "pip", "install", "--user", "--upgrade", "pip", "pyyaml"], sudo=False, check=False, logger=logger)
     try:
         import yaml as _yaml  # type: ignore
         yaml = _yaml
@@ -1,7 +1,9 @@
 from .ops import package_plan, ensure_packages, load_config
 
-def install_selected(selected):
-    cfg = load_config()
+def install_selected(selected, cfg=None):
+    """Install the planned packages in selected (all if empty); pass cfg to skip reloading it."""
+    if cfg is None:
+        cfg = load_config()
     pkgs = package_plan(cfg)
     final = [p for p in pkgs if (not selected or p in selected)]
     ensure_packages(final)